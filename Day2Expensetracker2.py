@@ -2,6 +2,92 @@ import streamlit as st
 import pandas as pd
 import io
 import plotly.express as px
+from expense_core import (BULK_COLUMNS, CURRENCY_COLUMN, TRANSFER_COLUMNS, bulk_balances, itemized_balances, read_roster, settle,
+                          summarize, top_contributors)
+from money import equal_balances, to_major
+from currency_rates import DEFAULT_BASE_CURRENCY, RATES_FILE, convert, currency_symbol, load_rates
+from tabular_io import EXPORT_FORMATS, iter_frames, spool_export
+import expense_ledger
+
+MAX_PEOPLE = 500
+
+# --- Export ---
+def download_buttons(summary, transfers, fmt, key):
+    """Offer the summary and settlement plan for download.
+
+    The files are only written, chunk by chunk, when a button is clicked.
+    """
+    mime, suffix = EXPORT_FORMATS[fmt]
+    plan = pd.DataFrame(transfers, columns=TRANSFER_COLUMNS)
+    col_summary, col_plan = st.columns(2)
+    col_summary.download_button(
+        label=f"Download Summary ({fmt.upper()})",
+        data=lambda: spool_export(iter_frames(summary), fmt),
+        file_name=f"expense_summary{suffix}",
+        mime=mime,
+        on_click="ignore",
+        key=f"{key}_summary"
+    )
+    col_plan.download_button(
+        label=f"Download Settlement Plan ({fmt.upper()})",
+        data=lambda: spool_export(iter_frames(plan), fmt),
+        file_name=f"settlement_plan{suffix}",
+        mime=mime,
+        on_click="ignore",
+        key=f"{key}_plan"
+    )
+
+
+# --- Chart ---
+@st.cache_data(max_entries=32)
+def contribution_chart(names, contributions, top_n):
+    """Pie chart of the top contributors; cached on the contributions themselves."""
+    chart_df = top_contributors(names, contributions, top_n)
+    fig = px.pie(
+        chart_df,
+        names="Name",
+        values="Contributed",
+        title="Who Paid What",
+        hole=0.3
+    )
+    fig.update_traces(
+        textinfo='label+percent+value',
+        textposition='inside'
+    )
+    return fig
+
+
+# --- Reset ---
+def clear_inputs():
+    """Reset every input; runs as the Clear All callback, before the widgets are drawn again."""
+    st.session_state["total_amount"] = 0.0
+    st.session_state["num_people"] = 2
+    for key in [k for k in st.session_state if k.startswith(("name_", "contrib_", "currency_"))]:
+        del st.session_state[key]
+    for key in ["roster", "roster_editor", "roster_file_id"]:
+        st.session_state.pop(key, None)
+
+
+# --- Exchange rates ---
+@st.cache_data
+def get_rates(mtime):
+    """Load the rate snapshot once; a new file modification time reloads it."""
+    return load_rates(RATES_FILE)
+
+
+# --- Bulk split ---
+@st.cache_data(max_entries=8)
+def get_bulk_balances(file_id, base_currency, rates, _source):
+    """Balances for an uploaded expense file, read once per file, base currency and rate table."""
+    _source.seek(0)
+    return bulk_balances(_source, base=base_currency, rates=rates)
+
+
+# --- Ledger ---
+@st.cache_resource
+def get_ledger():
+    return expense_ledger.open_ledger()
+
 
 # Page setup
 st.set_page_config(page_title="Expense Splitter", layout="centered")
@@ -14,81 +100,132 @@ if "total_amount" not in st.session_state:
 if "num_people" not in st.session_state:
     st.session_state["num_people"] = 2
 
-# Input: Total amount and number of people
-total_amount = st.number_input("Enter Total Expense Amount", min_value=0.0, format="%.2f", key="total_amount")
-num_people = st.number_input("Enter Number of People", min_value=1, max_value=20, value=st.session_state["num_people"], key="num_people")
-
-# Display per-person share immediately
-if total_amount > 0 and num_people > 0:
-    per_person_share = total_amount / num_people
-    st.info(f"💡 Each person should contribute: ₹{per_person_share:.2f}")
-
-# Initialize dynamic fields
-for i in range(num_people):
-    st.session_state.setdefault(f"name_{i}", "")
-    st.session_state.setdefault(f"contrib_{i}", 0.0)
-
-# Input: Names and Contributions
-st.subheader("Enter Names and Their Contributions")
-names = []
-contributions = []
-
-for i in range(num_people):
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        name = st.text_input(f"Name of Person {i+1}", key=f"name_{i}")
-    with col2:
-        contribution = st.number_input(f"Contribution by {name or f'Person {i+1}'}", min_value=0.0, format="%.2f", key=f"contrib_{i}")
-    names.append(name)
-    contributions.append(contribution)
+# Input: Currency, total amount and how to enter people
+rates, rates_date = get_rates(RATES_FILE.stat().st_mtime)
+currency_codes = sorted(rates)
+col_base, col_multi = st.columns([1, 2])
+base_currency = col_base.selectbox("Base Currency", currency_codes, index=currency_codes.index(DEFAULT_BASE_CURRENCY), key="base_currency")
+multi_currency = col_multi.toggle("Contributions in several currencies", key="multi_currency")
+cur = currency_symbol(base_currency)
+
+total_amount = st.number_input(f"Enter Total Expense Amount ({base_currency})", min_value=0.0, format="%.2f", key="total_amount")
+input_mode = st.radio("Input Mode", ["Per Person", "Table"], horizontal=True, key="input_mode",
+                      help="Table mode edits the whole roster at once and stays fast for large groups.")
+
+if input_mode == "Per Person":
+    num_people = st.number_input("Enter Number of People", min_value=1, max_value=MAX_PEOPLE, key="num_people")
+
+    # Display per-person share immediately
+    if total_amount > 0 and num_people > 0:
+        per_person_share = total_amount / num_people
+        st.info(f"💡 Each person should contribute: {cur}{per_person_share:.2f}")
+
+    # Initialize dynamic fields
+    for i in range(num_people):
+        st.session_state.setdefault(f"name_{i}", "")
+        st.session_state.setdefault(f"contrib_{i}", 0.0)
+
+    # Input: Names and Contributions
+    st.subheader("Enter Names and Their Contributions")
+    names = []
+    contributions = []
+    currencies = []
+
+    for i in range(num_people):
+        if multi_currency:
+            col1, col2, col3 = st.columns([2, 1, 1])
+        else:
+            col1, col2 = st.columns([2, 1])
+        with col1:
+            name = st.text_input(f"Name of Person {i+1}", key=f"name_{i}")
+        with col2:
+            contribution = st.number_input(f"Contribution by {name or f'Person {i+1}'}", min_value=0.0, format="%.2f", key=f"contrib_{i}")
+        if multi_currency:
+            currency = col3.selectbox("Currency", currency_codes, index=currency_codes.index(base_currency), key=f"currency_{i}")
+        else:
+            currency = base_currency
+        names.append(name)
+        contributions.append(contribution)
+        currencies.append(currency)
+else:
+    # The whole roster lives in one DataFrame, so reruns cost the same for any group size
+    if "roster" not in st.session_state:
+        st.session_state["roster"] = pd.DataFrame({"Name": ["", ""], "Contributed": [0.0, 0.0], "Currency": ["", ""]})
+
+    st.subheader("Enter Names and Their Contributions")
+    roster_file = st.file_uploader("Upload roster (CSV with Name, Contributed and optional Currency)", type=["csv"], key="roster_file")
+    pasted = st.text_area("...or paste one \"Name, amount\" per line (tabs from a spreadsheet work too)")
+    if roster_file is not None and st.session_state.get("roster_file_id") != roster_file.file_id:
+        source = roster_file
+        st.session_state["roster_file_id"] = roster_file.file_id
+    elif st.button("Load Pasted Roster") and pasted.strip():
+        source = io.StringIO(pasted)
+    else:
+        source = None
+    if source is not None:
+        try:
+            st.session_state["roster"] = read_roster(source)
+            st.session_state.pop("roster_editor", None)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+
+    roster = st.data_editor(
+        st.session_state["roster"],
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "Contributed": st.column_config.NumberColumn(min_value=0.0, format="%.2f"),
+            "Currency": st.column_config.SelectboxColumn(options=currency_codes, help="Blank means the base currency"),
+        },
+        column_order=["Name", "Contributed", "Currency"] if multi_currency else ["Name", "Contributed"],
+        key="roster_editor"
+    )
+    names = roster["Name"].fillna("").astype(str).tolist()
+    contributions = roster["Contributed"].fillna(0.0).astype(float).tolist()
+    currencies = roster["Currency"].tolist() if multi_currency else [base_currency] * len(names)
+    num_people = len(names)
+
+    if total_amount > 0 and num_people > 0:
+        per_person_share = total_amount / num_people
+        st.info(f"💡 {num_people} people, each should contribute: {cur}{per_person_share:.2f}")
 
 # Buttons: Calculate and Clear
+chart_top_n = st.slider("Contributors shown in chart", min_value=3, max_value=50, value=10, key="chart_top_n",
+                        help="Everyone else is grouped into one \"Others\" slice.")
+export_format = st.radio("Export Format", list(EXPORT_FORMATS), horizontal=True, format_func=str.upper, key="export_format")
 col_calc, col_clear = st.columns([1, 1])
 calculate_clicked = col_calc.button("Calculate Split")
-clear_clicked = col_clear.button("Clear All")
-
-# Clear all inputs
-if clear_clicked:
-    st.session_state["total_amount"] = 0.0
-    st.session_state["num_people"] = 2
-    for i in range(20):
-        st.session_state[f"name_{i}"] = ""
-        st.session_state[f"contrib_{i}"] = 0.0
-    st.experimental_rerun()
+col_clear.button("Clear All", on_click=clear_inputs)
 
 # Calculate and display results
 if calculate_clicked:
-    if total_amount == 0 or any(name.strip() == "" for name in names):
+    if total_amount == 0 or num_people == 0 or any(name.strip() == "" for name in names):
         st.warning("Please enter a valid total amount and all names.")
     else:
         per_person_share = total_amount / num_people
-        st.success(f"Each person should contribute: ₹{per_person_share:.2f}")
+        st.success(f"Each person should contribute: {cur}{per_person_share:.2f}")
 
-        balances = [round(per_person_share - c, 2) for c in contributions]
+        # Convert every contribution to the base currency, then split to the paisa
+        paid = convert(contributions, currencies, base_currency, rates).round(2)
+        balances = to_major(equal_balances(total_amount, paid)).tolist()
         data = {
             "Name": names,
-            "Contributed": contributions,
+            "Contributed": paid.tolist(),
             "Balance": balances
         }
 
         df = pd.DataFrame(data)
+        if multi_currency:
+            df.insert(1, "Paid", contributions)
+            df.insert(2, "Currency", [c or base_currency for c in currencies])
+            st.caption(f"Converted to {base_currency} with rates from {rates_date}.")
 
         st.subheader("💰 Contribution Summary")
         st.dataframe(df)
 
         # Pie Chart of Contributions with amount and percentage labels
         st.subheader("📊 Contribution Breakdown")
-        fig = px.pie(
-            df,
-            names="Name",
-            values="Contributed",
-            title="Who Paid What",
-            hole=0.3
-        )
-        fig.update_traces(
-            textinfo='label+percent+value',
-            textposition='inside'
-        )
+        fig = contribution_chart(tuple(names), tuple(df["Contributed"]), chart_top_n)
         st.plotly_chart(fig, use_container_width=True)
 
         # People who owe money or should be refunded
@@ -98,20 +235,109 @@ if calculate_clicked:
 
         if not owes.empty:
             for _, row in owes.iterrows():
-                st.write(f"👉 {row['Name']} owes ₹{row['Balance']:.2f}")
+                st.write(f"👉 {row['Name']} owes {cur}{row['Balance']:.2f}")
         if not overpaid.empty:
             for _, row in overpaid.iterrows():
-                st.write(f"✅ {row['Name']} should be returned ₹{abs(row['Balance']):.2f}")
+                st.write(f"✅ {row['Name']} should be returned {cur}{abs(row['Balance']):.2f}")
         if owes.empty and overpaid.empty:
             st.success("All contributions are perfectly balanced! 🎉")
 
-        # Export as CSV
+        # Who pays whom, with as few transfers as possible
+        transfers = settle(names, balances)
+        if transfers:
+            st.subheader("🤝 Settlement Plan")
+            st.caption(f"{len(transfers)} transfer(s) settle the whole group.")
+            for payer, receiver, amount in transfers:
+                st.write(f"💸 {payer} pays {receiver} {cur}{amount:.2f}")
+
+        # Export summary and settlement plan
         st.subheader("📥 Download Summary")
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False)
-        st.download_button(
-            label="Download CSV",
-            data=csv_buffer.getvalue(),
-            file_name="expense_summary.csv",
-            mime="text/csv"
-        )
+        download_buttons(df, transfers, export_format, key="split")
+
+# Itemized bill: each item is shared only by the people who had it
+with st.expander("🧾 Itemized Bill"):
+    st.caption("List each item, who paid for it and who shared it. "
+               "Separate participants with ';' and add a weight after ':' (e.g. Asha:2;Ravi). "
+               f"Amounts are in {base_currency}" + (" unless another currency is picked." if multi_currency else "."))
+    items = st.data_editor(
+        pd.DataFrame({"item": [""], "payer": [""], "amount": [0.0], CURRENCY_COLUMN: [""], "participants": [""]}),
+        num_rows="dynamic",
+        column_config={
+            CURRENCY_COLUMN: st.column_config.SelectboxColumn(options=currency_codes, help="Blank means the base currency"),
+        },
+        column_order=["item", "payer", "amount", CURRENCY_COLUMN, "participants"] if multi_currency
+        else ["item", "payer", "amount", "participants"],
+        key="itemized_bill"
+    )
+    if st.button("Split Items"):
+        filled = items.replace("", None).dropna(subset=["payer", "participants"])
+        if filled.empty:
+            st.warning("Please add at least one item with a payer and participants.")
+        else:
+            try:
+                if multi_currency:
+                    filled = filled.assign(amount=convert(filled["amount"], filled[CURRENCY_COLUMN], base_currency, rates))
+                items_df = summarize(*itemized_balances(filled))
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                if multi_currency:
+                    st.caption(f"Converted to {base_currency} with rates from {rates_date}.")
+                st.dataframe(items_df)
+                for payer, receiver, amount in settle(items_df["Name"].tolist(), items_df["Balance"].tolist()):
+                    st.write(f"💸 {payer} pays {receiver} {cur}{amount:.2f}")
+
+# Group ledger: expenses are saved to disk and balances kept up to date
+with st.expander("📒 Group Ledger"):
+    ledger = get_ledger()
+    known_groups = expense_ledger.list_groups(ledger)
+    group = st.selectbox("Group", known_groups + ["➕ New group"], key="ledger_group")
+    if group == "➕ New group":
+        group = st.text_input("New group name", key="ledger_new_group").strip()
+
+    if group:
+        # A group stays in the currency it was started in, whatever the base currency is now
+        ledger_currency = expense_ledger.group_currency(ledger, group) or base_currency
+        ledger_cur = currency_symbol(ledger_currency)
+        with st.form("ledger_expense", clear_on_submit=True):
+            col_event, col_payer, col_amount = st.columns([2, 2, 1])
+            event = col_event.text_input("Expense")
+            payer = col_payer.text_input("Paid by")
+            amount = col_amount.number_input(f"Amount ({ledger_currency})", min_value=0.0, format="%.2f")
+            participants = st.text_input("Shared by (separate with ';', optional weight after ':')")
+            if st.form_submit_button("Add to Ledger"):
+                if not payer.strip() or not participants.strip() or amount == 0:
+                    st.warning("Please enter who paid, the amount and who shared it.")
+                else:
+                    try:
+                        expense_ledger.add_expense(ledger, group, event, payer, amount, participants, ledger_currency)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+
+        ledger_df = expense_ledger.group_balances(ledger, group)
+        if ledger_df.empty:
+            st.info("No expenses in this group yet.")
+        else:
+            st.caption(f"This group's amounts are in {ledger_currency}.")
+            st.dataframe(ledger_df)
+            for payer, receiver, amount in settle(ledger_df["Name"].tolist(), ledger_df["Balance"].tolist()):
+                st.write(f"💸 {payer} pays {receiver} {ledger_cur}{amount:.2f}")
+            st.button("Rebuild Balances", on_click=expense_ledger.rebuild_balances, args=(ledger, group),
+                      help="Recompute this group's balances from its saved expenses.")
+
+# Bulk split: settle a whole file of expenses with the same engine
+with st.expander("📂 Bulk Split from File"):
+    st.caption(f"Upload a CSV or Parquet file with columns: {', '.join(BULK_COLUMNS)}. "
+               f"Separate participants with ';'. An optional {CURRENCY_COLUMN} column is converted to {base_currency}.")
+    bulk_file = st.file_uploader("Expense file", type=["csv", "parquet"])
+    if bulk_file is not None:
+        try:
+            bulk_df = get_bulk_balances(bulk_file.file_id, base_currency, rates, bulk_file)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            st.dataframe(bulk_df)
+            bulk_transfers = settle(bulk_df["Name"].tolist(), bulk_df["Balance"].tolist())
+            st.caption(f"{len(bulk_transfers)} transfer(s) settle the whole group.")
+            st.dataframe(pd.DataFrame(bulk_transfers, columns=TRANSFER_COLUMNS))
+            download_buttons(bulk_df, bulk_transfers, export_format, key="bulk")
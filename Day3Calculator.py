@@ -1,4 +1,57 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from calc_engine import (CONSTANTS, DEFAULT_PRECISION, FUNCTIONS, NUMBER_MODES, column_variables, compile_expression,
+                         evaluate, evaluate_frame, format_number, insert_gaps, minmax_decimate, normalize, parse_assignments,
+                         parse_number, refine_breaks, sample_function)
+from tabular_io import EXPORT_FORMATS, iter_chunks, iter_frames, read_columns, spool_export, spool_preview
+import calc_history
+
+# Symbol for each Simple mode operation; the engine reads them as operators
+SIMPLE_OPERATIONS = {"Add": "+", "Subtract": "-", "Multiply": "×", "Divide": "÷"}
+# Name that stands for the previous result, in either mode
+ANSWER_NAME = "ans"
+
+# Operations offered for two-column batch calculations
+BATCH_OPERATIONS = {"Add": "+", "Subtract": "-", "Multiply": "*", "Divide": "/"}
+
+# Plot mode: points drawn and table rows shown, however fine the grid is
+PLOT_BINS = 2000
+TABLE_ROWS = 500
+
+
+def batch_results(source, text, error_counts):
+    """Yield each input chunk with Result and Error columns, counting errors as it goes."""
+    for chunk in iter_chunks(source):
+        results = evaluate_frame(text, chunk)
+        error_counts.append(results["Error"].value_counts())
+        yield pd.concat([chunk, results], axis=1)
+
+
+@st.cache_resource
+def get_history():
+    return calc_history.open_history()
+
+
+def operand(text, number_mode):
+    """Read a Simple mode input: a number, or "ans" for this session's previous result."""
+    if text.strip().lower() == ANSWER_NAME:
+        text = st.session_state.answer
+        if text is None:
+            raise ValueError
+    return parse_number(text, number_mode)
+
+
+def reuse_result(value, mode):
+    """Button callback putting a past result into the current inputs."""
+    if mode == "Simple":
+        st.session_state.input1_value = value
+    else:
+        st.session_state.expression_value = (st.session_state.get("expression_value", "") + " " + value).strip()
+
+
+history = get_history()
 
 # Step 1: Initialize session state
 if "reset_triggered" not in st.session_state:
@@ -9,11 +62,20 @@ if "calc_text" not in st.session_state:
     st.session_state.calc_text = ""
 if "error" not in st.session_state:
     st.session_state.error = ""
+if "answer" not in st.session_state:
+    # Text of this session's last result; the history is shared by everyone
+    st.session_state.answer = None
+if "history_pages" not in st.session_state:
+    # Id each visited history page starts below; the last one is shown
+    st.session_state.history_pages = [None]
 
 # Step 2: Reset logic BEFORE rendering widgets
 if st.session_state.reset_triggered:
     st.session_state.input1_value = ""
     st.session_state.input2_value = ""
+    st.session_state.expression_value = ""
+    st.session_state.variables_value = ""
+    st.session_state.plot_expression = ""
     st.session_state.result = ""
     st.session_state.calc_text = ""
     st.session_state.error = ""
@@ -22,12 +84,60 @@ if st.session_state.reset_triggered:
 # Step 3: Title
 st.title("🧮 Simple Calculator")
 
-# Step 4: Input fields
-input1 = st.text_input("Enter first number", key="input1_value")
-input2 = st.text_input("Enter second number", key="input2_value")
+# Step 4: Mode and input fields
+mode = st.radio("Mode", ["Simple", "Expression", "Batch", "Plot"], horizontal=True)
+
+if mode == "Simple":
+    input1 = st.text_input("Enter first number", key="input1_value", placeholder=f"a number or {ANSWER_NAME}")
+    input2 = st.text_input("Enter second number", key="input2_value")
+
+    # Step 5: Operation selection
+    operation = st.selectbox("Choose operation", ["Add", "Subtract", "Multiply", "Divide"])
+elif mode == "Expression":
+    expression = st.text_input("Enter expression", key="expression_value", placeholder="e.g. (2 + 3) ^ 2 / sqrt(x)")
+    variables_text = st.text_input("Variables (optional)", key="variables_value", placeholder="e.g. x=16, y=2")
+    st.caption(f"Functions: {', '.join(FUNCTIONS)} · Constants: {', '.join(CONSTANTS)} · "
+               f"`{ANSWER_NAME}` is the previous result")
 
-# Step 5: Operation selection
-operation = st.selectbox("Choose operation", ["Add", "Subtract", "Multiply", "Divide"])
+if mode in ("Simple", "Expression"):
+    # Decimal keeps a chosen number of digits, Fraction is exact; whole
+    # numbers are exact big integers in every mode
+    col_numbers, col_precision = st.columns(2)
+    number_mode = col_numbers.radio("Numbers", list(NUMBER_MODES), horizontal=True, key="number_mode")
+    precision = DEFAULT_PRECISION
+    if number_mode == "Decimal":
+        precision = col_precision.number_input("Significant digits", min_value=1, max_value=10_000,
+                                               value=DEFAULT_PRECISION, key="precision")
+    # Part of the memo key, so a result is only reused in the same mode
+    number_label = {"Float": "", "Decimal": f" [Decimal, {precision} digits]", "Fraction": " [Fraction]"}[number_mode]
+elif mode == "Plot":
+    plot_expression = st.text_input("Enter expression in x", key="plot_expression", placeholder="e.g. sin(x) / x")
+    col_start, col_stop, col_step = st.columns(3)
+    x_start = col_start.number_input("From", value=-10.0)
+    x_stop = col_stop.number_input("To", value=10.0)
+    x_step = col_step.number_input("Step", value=0.01, min_value=0.0, format="%g")
+else:
+    batch_file = st.file_uploader("Upload a CSV or Parquet file", type=["csv", "parquet"], key="batch_file")
+    column_names = {}
+    if batch_file is not None:
+        try:
+            column_names = column_variables(read_columns(batch_file))
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            batch_file = None
+
+    batch_style = st.radio("Calculate with", ["Two columns", "Expression over columns"], horizontal=True)
+    if batch_style == "Two columns":
+        col_a, col_op, col_b = st.columns([2, 1, 2])
+        first = col_a.selectbox("First column", list(column_names))
+        operation = col_op.selectbox("Operation", list(BATCH_OPERATIONS))
+        second = col_b.selectbox("Second column", list(column_names), index=min(1, max(len(column_names) - 1, 0)))
+        batch_expression = f"{column_names[first]} {BATCH_OPERATIONS[operation]} {column_names[second]}" if column_names else ""
+    else:
+        batch_expression = st.text_input("Expression", key="batch_expression", placeholder="e.g. price * qty / (1 + tax)")
+        if column_names:
+            st.caption("Columns: " + ", ".join(column_names.values()))
+    batch_format = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True, format_func=str.upper)
 
 # Step 6: Buttons with message
 col1, col2 = st.columns([1, 2])
@@ -41,28 +151,96 @@ if reset:
     st.session_state.reset_triggered = True
 
 # Step 8: Calculation logic
-if calculate:
+if calculate and mode == "Plot":
+    try:
+        x, y = sample_function(plot_expression, x_start, x_stop, x_step)
+        # Sample more densely around jumps, break the line at poles, then
+        # keep only each slice's lowest and highest point for drawing
+        plot_x, plot_y = minmax_decimate(*insert_gaps(*refine_breaks(plot_expression, x, y)), n_bins=PLOT_BINS)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+    else:
+        st.success(f"y = {normalize(plot_expression)} on {len(x):,} points")
+        fig = go.Figure(go.Scatter(x=plot_x, y=plot_y, mode="lines", connectgaps=False))
+        fig.update_layout(xaxis_title="x", yaxis_title="y", margin=dict(t=30))
+        st.plotly_chart(fig, use_container_width=True)
+
+        table = pd.DataFrame({"x": x, "y": y})
+        shown = table.iloc[np.unique(np.linspace(0, len(table) - 1, TABLE_ROWS).astype(int))]
+        if len(shown) < len(table):
+            st.caption(f"Showing {len(shown)} of {len(table):,} rows; download for all of them.")
+        st.dataframe(shown, hide_index=True)
+        st.download_button("Download Table", data=lambda: spool_export(iter_frames(table)), file_name="function_table.csv",
+                           mime="text/csv", on_click="ignore")
+
+elif calculate and mode == "Batch":
+    if batch_file is None or not batch_expression.strip():
+        st.warning("Please upload a file and choose what to calculate.")
+    else:
+        try:
+            error_counts = []
+            results_file, preview = spool_preview(batch_results(batch_file, batch_expression, error_counts), batch_format)
+            with results_file:
+                counts = pd.concat(error_counts, axis=1).sum(axis=1)
+                st.success(f"Calculated {int(counts.sum()):,} rows: {normalize(batch_expression)}")
+                problems = counts.drop("").loc[lambda c: c > 0]
+                if not problems.empty:
+                    st.warning("Rows without a result: " + ", ".join(f"{reason} ({int(n):,})" for reason, n in problems.items()))
+
+                st.dataframe(preview)
+                mime, suffix = EXPORT_FORMATS[batch_format]
+                st.download_button("Download Results", data=results_file, file_name=f"batch_results{suffix}", mime=mime, on_click="ignore")
+        except Exception as e:
+            st.error(f"❌ {e}")
+
+elif calculate and mode == "Expression":
     try:
-        a = float(input1)
-        b = float(input2)
-
-        if operation == "Add":
-            result = a + b
-            symbol = "+"
-        elif operation == "Subtract":
-            result = a - b
-            symbol = "-"
-        elif operation == "Multiply":
-            result = a * b
-            symbol = "×"
-        elif operation == "Divide":
-            if b == 0:
-                raise ZeroDivisionError("Cannot divide by zero")
-            result = a / b
-            symbol = "÷"
-
-        st.session_state.result = f"The result is {result}"
-        st.session_state.calc_text = f"Calculation: {a} {symbol} {b}"
+        variables = parse_assignments(variables_text, number_mode, precision)
+        if ANSWER_NAME in compile_expression(expression, number_mode).variables and ANSWER_NAME not in variables:
+            if st.session_state.answer is not None:
+                variables[ANSWER_NAME] = parse_number(st.session_state.answer, number_mode)
+
+        # The calculation text doubles as the memo key, so it lists the
+        # variable values the result depends on
+        calc = normalize(expression)
+        if variables:
+            calc += f" with {', '.join(f'{k} = {format_number(v)}' for k, v in variables.items())}"
+        calc += number_label
+        result, from_memo = calc_history.calculate(
+            history, calc, lambda: format_number(evaluate(expression, variables, number_mode, precision))
+        )
+
+        st.session_state.answer = result
+        st.session_state.result = f"The result is {result}" + (" (from history)" if from_memo else "")
+        st.session_state.calc_text = f"Calculation: {calc}"
+        st.session_state.error = ""
+
+    except ValueError as e:
+        st.session_state.result = ""
+        st.session_state.calc_text = ""
+        st.session_state.error = f"❌ {e}"
+    except ZeroDivisionError:
+        st.session_state.result = ""
+        st.session_state.calc_text = ""
+        st.session_state.error = "❌ Cannot divide by zero"
+
+elif calculate:
+    try:
+        a = operand(input1, number_mode)
+        b = operand(input2, number_mode)
+
+        symbol = SIMPLE_OPERATIONS[operation]
+        if operation == "Divide" and b == 0:
+            raise ZeroDivisionError("Cannot divide by zero")
+        # Bracket fractions like 1/3 so the calculation reads unambiguously
+        calc = " ".join(f"({v})" if "/" in v else v for v in map(format_number, (a, symbol, b))) + number_label
+        result, from_memo = calc_history.calculate(
+            history, calc, lambda: format_number(evaluate(f"a {symbol} b", {"a": a, "b": b}, number_mode, precision))
+        )
+
+        st.session_state.answer = result
+        st.session_state.result = f"The result is {result}" + (" (from history)" if from_memo else "")
+        st.session_state.calc_text = f"Calculation: {calc}"
         st.session_state.error = ""
 
     except ValueError:
@@ -81,3 +259,33 @@ if st.session_state.calc_text:
     st.info(st.session_state.calc_text)
 if st.session_state.error:
     st.error(st.session_state.error)
+
+# Step 10: History, saved across sessions and searchable
+with st.expander("🕘 History"):
+    query = st.text_input("Search history", key="history_query",
+                          on_change=lambda: st.session_state.update(history_pages=[None]))
+    pages = st.session_state.history_pages
+    rows = calc_history.search_history(history, query, before=pages[-1])
+    if not rows:
+        st.caption("No calculations yet." if not query and len(pages) == 1 else "Nothing found.")
+    else:
+        st.dataframe(pd.DataFrame(rows, columns=["#", "Calculation", "Result", "Time"]), hide_index=True)
+
+        col_prev, col_next, col_page = st.columns([1, 1, 3])
+        if col_prev.button("◀ Newer", disabled=len(pages) == 1):
+            pages.pop()
+            st.rerun()
+        if col_next.button("Older ▶", disabled=len(rows) < calc_history.PAGE_SIZE):
+            pages.append(rows[-1][0])
+            st.rerun()
+        col_page.caption(f"Page {len(pages)}")
+
+        if mode in ("Simple", "Expression"):
+            col_pick, col_use = st.columns([3, 1])
+            picked = col_pick.selectbox("Reuse a result", rows, format_func=lambda r: f"#{r[0]}: {r[1]} = {r[2]}")
+            col_use.button("Use", on_click=reuse_result, args=(picked[2], mode))
+
+    if st.button("Clear history"):
+        calc_history.clear_history(history)
+        st.session_state.history_pages = [None]
+        st.rerun()
@@ -1,5 +1,9 @@
+import numpy as np
 import streamlit as st
 import plotly.graph_objects as go
+from bmi_core import (BMI_CATEGORIES, BMI_CUTOFFS, compute_bmi, convert_to_metric, count_summary,
+                      score_file)
+from tabular_io import EXPORT_FORMATS, read_columns, spool_preview
 
 # --- Page Config ---
 st.set_page_config(page_title="BMI Calculator", page_icon="🧍‍♂️", layout="centered")
@@ -38,12 +42,6 @@ with input_col1:
 with input_col2:
     weight = st.number_input(f"Weight ({weight_unit})", min_value=0.0, format="%.2f")
 
-# --- Conversion Logic ---
-def convert_to_metric(height, weight, h_unit, w_unit):
-    height_cm = height * 30.48 if h_unit == "feet" else height
-    weight_kg = weight * 0.453592 if w_unit == "lb" else weight
-    return height_cm, weight_kg
-
 # --- Custom Balloons ---
 def show_custom_balloons():
     st.markdown("""
@@ -67,6 +65,14 @@ def show_custom_balloons():
     <div class="balloon" style="left: 70%;">🎈</div>
     """, unsafe_allow_html=True)
 
+# --- Category Feedback ---
+CATEGORY_FEEDBACK = {
+    "Underweight": ("You are underweight. Consider consulting a healthcare provider.", "😟"),
+    "Normal weight": ("You have a healthy weight. Great job!", "🎉😊"),
+    "Overweight": ("You are overweight. A balanced diet and regular exercise can help.", "🤔"),
+    "Obese": ("You are in the obese range. It's important to seek medical advice.", "😢"),
+}
+
 # --- Health Tips ---
 def get_health_tip(category):
     tips = {
@@ -100,27 +106,14 @@ def show_bmi_gauge(bmi):
 if st.button("🚀 Calculate BMI"):
     if height > 0 and weight > 0:
         height_cm, weight_kg = convert_to_metric(height, weight, height_unit, weight_unit)
-        height_m = height_cm / 100
-        bmi = round(weight_kg / (height_m ** 2), 2)
+        bmi = float(compute_bmi(height_cm, weight_kg))
 
         # --- Classification & Emoji Feedback ---
-        if bmi < 18.5:
-            category = "Underweight"
-            message = "You are underweight. Consider consulting a healthcare provider."
-            emoji = "😟"
-        elif 18.5 <= bmi < 25:
-            category = "Normal weight"
-            message = "You have a healthy weight. Great job!"
-            emoji = "🎉😊"
+        # Same cut points as batch scoring, so one patient and a roster agree
+        category = BMI_CATEGORIES[np.digitize(bmi, BMI_CUTOFFS)]
+        message, emoji = CATEGORY_FEEDBACK[category]
+        if category == "Normal weight":
             show_custom_balloons()
-        elif 25 <= bmi < 30:
-            category = "Overweight"
-            message = "You are overweight. A balanced diet and regular exercise can help."
-            emoji = "🤔"
-        else:
-            category = "Obese"
-            message = "You are in the obese range. It's important to seek medical advice."
-            emoji = "😢"
 
         # --- Result Display ---
         st.markdown(f"## ✅ Your BMI is **{bmi}** — *{category}* {emoji}")
@@ -133,3 +126,44 @@ if st.button("🚀 Calculate BMI"):
         st.markdown(get_health_tip(category))
     else:
         st.error("Please enter valid height and weight to calculate your BMI.")
+
+# --- Batch Scoring ---
+st.markdown("---")
+st.markdown("### 🏥 Score a Patient Roster")
+batch_file = st.file_uploader("Upload a CSV or Parquet file with one row per patient", type=["csv", "parquet"])
+
+columns = []
+if batch_file is not None:
+    try:
+        columns = read_columns(batch_file)
+    except ValueError as e:
+        st.error(str(e))
+
+if columns:
+    batch_col1, batch_col2 = st.columns(2)
+    with batch_col1:
+        height_column = st.selectbox("Height column", columns)
+        batch_height_unit = st.radio("Height unit", ["cm", "feet"], horizontal=True)
+    with batch_col2:
+        weight_column = st.selectbox("Weight column", columns, index=min(1, len(columns) - 1))
+        batch_weight_unit = st.radio("Weight unit", ["kg", "lb"], horizontal=True)
+    batch_format = st.radio("Download format", list(EXPORT_FORMATS), horizontal=True, format_func=str.upper)
+
+    if st.button("📋 Score File"):
+        try:
+            # One pass: scored chunks go straight to a temp file while the
+            # category counts are tallied
+            counts = np.zeros(len(BMI_CATEGORIES) + 1, dtype=np.int64)
+            results_file, preview = spool_preview(score_file(batch_file, height_column, weight_column, batch_height_unit,
+                                                             batch_weight_unit, counts=counts), batch_format)
+            with results_file:
+                summary = count_summary(counts)
+                st.success(f"Scored {counts.sum():,} patients")
+                st.table(summary)
+                st.bar_chart(summary.set_index("Category")["Patients"])
+                st.dataframe(preview)
+                mime, suffix = EXPORT_FORMATS[batch_format]
+                st.download_button("Download Scored File", data=results_file,
+                                   file_name=f"bmi_scores{suffix}", mime=mime, on_click="ignore")
+        except Exception as e:
+            st.error(f"Error scoring file: {str(e)}")
@@ -1,6 +1,47 @@
+import math
 import streamlit as st
-import requests
 from datetime import datetime
+from rate_cache import RateCache
+from tabular_io import EXPORT_FORMATS, read_columns, spool_preview
+from unit_query import build_index, convert_queries, format_parts, parse_queries, parse_query
+from unit_registry import DIMENSIONS, convert_file, convert_units, factor
+
+# Registered dimensions without a converter of their own (speed, ...)
+OTHER_DIMENSIONS = [name for name in DIMENSIONS if name not in ("Temperature", "Length", "Weight")]
+
+# Currency options (major currencies)
+CURRENCIES = {
+    "USD": "US Dollar",
+    "EUR": "Euro",
+    "GBP": "British Pound",
+    "JPY": "Japanese Yen",
+    "CAD": "Canadian Dollar",
+    "AUD": "Australian Dollar",
+    "CHF": "Swiss Franc",
+    "CNY": "Chinese Yuan",
+    "INR": "Indian Rupee",
+    "BRL": "Brazilian Real"
+}
+
+
+@st.cache_resource
+def get_rate_cache():
+    """One rate cache (and HTTP session) shared by every session of the app."""
+    return RateCache()
+
+
+@st.cache_resource
+def get_query_index():
+    """Unit and currency aliases for the text query box, compiled once."""
+    return build_index(CURRENCIES)
+
+
+def query_dimensions(queries):
+    """Conversion tables for parsed queries; live rates are only fetched if a query needs them."""
+    if any(query is not None and query.dimension == "Currency" for query in queries):
+        return {**DIMENSIONS, "Currency": get_rate_cache().table()[0]}
+    return DIMENSIONS
+
 
 # Page configuration
 st.set_page_config(
@@ -40,7 +81,7 @@ st.markdown('<h1 class="main-header">🔁 Universal Unit Converter</h1>', unsafe
 # Conversion categories
 conversion_type = st.selectbox(
     "Select Conversion Type:",
-    ["Currency", "Temperature", "Length", "Weight"],
+    ["Currency", "Temperature", "Length", "Weight"] + OTHER_DIMENSIONS + ["Text Query", "Batch File"],
     index=0
 )
 
@@ -50,71 +91,47 @@ st.markdown('<div class="conversion-box">', unsafe_allow_html=True)
 if conversion_type == "Currency":
     st.subheader("💱 Currency Converter")
     
-    # Currency options (major currencies)
-    currencies = {
-        "USD": "US Dollar",
-        "EUR": "Euro",
-        "GBP": "British Pound",
-        "JPY": "Japanese Yen",
-        "CAD": "Canadian Dollar",
-        "AUD": "Australian Dollar",
-        "CHF": "Swiss Franc",
-        "CNY": "Chinese Yuan",
-        "INR": "Indian Rupee",
-        "BRL": "Brazilian Real"
-    }
-    
     col1, col2 = st.columns(2)
     
     with col1:
-        from_currency = st.selectbox("From:", list(currencies.keys()), format_func=lambda x: f"{x} - {currencies[x]}")
+        from_currency = st.selectbox("From:", list(CURRENCIES.keys()), format_func=lambda x: f"{x} - {CURRENCIES[x]}")
         amount = st.number_input("Amount:", min_value=0.0, value=100.0, step=1.0)
     
     with col2:
-        to_currency = st.selectbox("To:", list(currencies.keys()), format_func=lambda x: f"{x} - {currencies[x]}")
+        to_currency = st.selectbox("To:", list(CURRENCIES.keys()), format_func=lambda x: f"{x} - {CURRENCIES[x]}")
     
     # Convert button
     if st.button("Convert Currency"):
         try:
-            # Using free currency API (example - you might need an API key for production)
-            url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
-            response = requests.get(url)
-            data = response.json()
+            # One cached USD table covers every pair as a cross rate; only
+            # the very first conversion waits for the API
+            rate_table, entry, stale = get_rate_cache().table()
+            rate, _ = factor(rate_table, from_currency, to_currency)
+            converted_amount = convert_units(rate_table, amount, from_currency, to_currency)
             
-            if response.status_code == 200:
-                rate = data['rates'][to_currency]
-                converted_amount = amount * rate
-                
-                st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
-                st.success(f"**{amount} {from_currency} = {converted_amount:.2f} {to_currency}**")
-                st.info(f"Exchange Rate: 1 {from_currency} = {rate:.4f} {to_currency}")
-                st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Show last updated time
-                last_updated = datetime.fromtimestamp(data['time_last_updated'])
+            st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
+            st.success(f"**{amount} {from_currency} = {converted_amount:.2f} {to_currency}**")
+            st.info(f"Exchange Rate: 1 {from_currency} = {rate:.4f} {to_currency}")
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+            # Show last updated time
+            if 'snapshot_date' in entry:
+                st.warning(f"Live rates are unavailable; using the saved snapshot ({entry['snapshot_date']})")
+            elif entry['updated']:
+                last_updated = datetime.fromtimestamp(entry['updated'])
                 st.caption(f"Rates updated: {last_updated.strftime('%Y-%m-%d %H:%M:%S')}")
-            else:
-                st.error("Unable to fetch exchange rates. Please try again later.")
+            if stale and 'snapshot_date' not in entry:
+                st.caption("Newer rates are being fetched in the background.")
                 
         except Exception as e:
             st.error(f"Error converting currency: {str(e)}")
-            # Fallback to manual rates (for demo purposes)
-            fallback_rates = {
-                'USD': {'EUR': 0.85, 'GBP': 0.75, 'JPY': 110.0},
-                'EUR': {'USD': 1.18, 'GBP': 0.88, 'JPY': 130.0},
-                'GBP': {'USD': 1.33, 'EUR': 1.14, 'JPY': 150.0}
-            }
-            if from_currency in fallback_rates and to_currency in fallback_rates[from_currency]:
-                rate = fallback_rates[from_currency][to_currency]
-                converted_amount = amount * rate
-                st.warning("Using fallback rates (demo mode)")
-                st.success(f"**{amount} {from_currency} = {converted_amount:.2f} {to_currency}**")
 
 # Temperature Conversion
 elif conversion_type == "Temperature":
     st.subheader("🌡️ Temperature Converter")
     
-    temp_units = ["Celsius", "Fahrenheit", "Kelvin"]
+    temperature = DIMENSIONS["Temperature"]
+    temp_units = temperature.units
     
     col1, col2 = st.columns(2)
     
@@ -128,21 +145,8 @@ elif conversion_type == "Temperature":
     # Convert instantly as user types
     if temp_value is not None:
         try:
-            # Convert to Celsius first
-            if from_temp == "Celsius":
-                base_temp = temp_value
-            elif from_temp == "Fahrenheit":
-                base_temp = (temp_value - 32) * 5/9
-            else:  # Kelvin
-                base_temp = temp_value - 273.15
-            
-            # Convert from Celsius to target unit
-            if to_temp == "Celsius":
-                result = base_temp
-            elif to_temp == "Fahrenheit":
-                result = (base_temp * 9/5) + 32
-            else:  # Kelvin
-                result = base_temp + 273.15
+            # One lookup in the precomputed (affine) temperature table
+            result = convert_units(temperature, temp_value, from_temp, to_temp)
             
             st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
             st.success(f"**{temp_value:.2f}° {from_temp[0]} = {result:.2f}° {to_temp[0]}**")
@@ -155,33 +159,22 @@ elif conversion_type == "Temperature":
 elif conversion_type == "Length":
     st.subheader("📏 Length Converter")
     
-    length_units = {
-        "Meters": 1.0,
-        "Kilometers": 1000.0,
-        "Centimeters": 0.01,
-        "Millimeters": 0.001,
-        "Miles": 1609.34,
-        "Yards": 0.9144,
-        "Feet": 0.3048,
-        "Inches": 0.0254
-    }
+    length = DIMENSIONS["Length"]
+    length_units = length.units
     
     col1, col2 = st.columns(2)
     
     with col1:
-        from_length = st.selectbox("From:", list(length_units.keys()))
+        from_length = st.selectbox("From:", length_units)
         length_value = st.number_input("Length:", min_value=0.0, value=1.0, step=0.1)
     
     with col2:
-        to_length = st.selectbox("To:", list(length_units.keys()))
+        to_length = st.selectbox("To:", length_units)
     
     # Convert instantly
     if length_value is not None:
         try:
-            # Convert to meters first
-            meters_value = length_value * length_units[from_length]
-            # Convert to target unit
-            result = meters_value / length_units[to_length]
+            result = convert_units(length, length_value, from_length, to_length)
             
             st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
             st.success(f"**{length_value:.4f} {from_length} = {result:.6f} {to_length}**")
@@ -194,31 +187,22 @@ elif conversion_type == "Length":
 elif conversion_type == "Weight":
     st.subheader("⚖️ Weight Converter")
     
-    weight_units = {
-        "Grams": 1.0,
-        "Kilograms": 1000.0,
-        "Milligrams": 0.001,
-        "Pounds": 453.592,
-        "Ounces": 28.3495,
-        "Tons": 1000000.0
-    }
+    weight = DIMENSIONS["Weight"]
+    weight_units = weight.units
     
     col1, col2 = st.columns(2)
     
     with col1:
-        from_weight = st.selectbox("From:", list(weight_units.keys()))
+        from_weight = st.selectbox("From:", weight_units)
         weight_value = st.number_input("Weight:", min_value=0.0, value=1.0, step=0.1)
     
     with col2:
-        to_weight = st.selectbox("To:", list(weight_units.keys()))
+        to_weight = st.selectbox("To:", weight_units)
     
     # Convert instantly
     if weight_value is not None:
         try:
-            # Convert to grams first
-            grams_value = weight_value * weight_units[from_weight]
-            # Convert to target unit
-            result = grams_value / weight_units[to_weight]
+            result = convert_units(weight, weight_value, from_weight, to_weight)
             
             st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
             st.success(f"**{weight_value:.4f} {from_weight} = {result:.6f} {to_weight}**")
@@ -227,8 +211,117 @@ elif conversion_type == "Weight":
         except Exception as e:
             st.error(f"Error in weight conversion: {str(e)}")
 
+# Any other registered dimension, including derived units such as speed
+elif conversion_type in OTHER_DIMENSIONS:
+    st.subheader(f"🧮 {conversion_type} Converter")
+    
+    dimension = DIMENSIONS[conversion_type]
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        from_unit = st.selectbox("From:", dimension.units)
+        unit_value = st.number_input(f"{conversion_type}:", min_value=0.0, value=1.0, step=0.1)
+    
+    with col2:
+        to_unit = st.selectbox("To:", dimension.units, index=min(1, len(dimension.units) - 1))
+    
+    # Convert instantly
+    if unit_value is not None:
+        try:
+            result = convert_units(dimension, unit_value, from_unit, to_unit)
+            
+            st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
+            st.success(f"**{unit_value:.4f} {from_unit} = {result:.6f} {to_unit}**")
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+        except Exception as e:
+            st.error(f"Error in {conversion_type.lower()} conversion: {str(e)}")
+
+# Free-text Conversion
+elif conversion_type == "Text Query":
+    st.subheader("⌨️ Text Query")
+    
+    query_index = get_query_index()
+    query_text = st.text_input("Convert:", placeholder="5 ft 11 in to cm, 72F in C, $20 to EUR")
+    
+    if query_text.strip():
+        try:
+            query = parse_query(query_text, query_index)
+            result = convert_queries([query], query_dimensions([query]))[0]
+            if math.isnan(result):
+                raise ValueError(f"No rate available for {query.to_unit}")
+            
+            st.markdown(f'<div class="result-box">', unsafe_allow_html=True)
+            st.success(f"**{format_parts(query)} = {result:,.6g} {query.to_unit}**")
+            st.markdown('</div>', unsafe_allow_html=True)
+            
+        except Exception as e:
+            st.error(str(e))
+    
+    # Many queries at once: parsed one by one, converted in one pass per dimension
+    bulk_text = st.text_area("Or paste one query per line:")
+    bulk_lines = [line for line in bulk_text.splitlines() if line.strip()]
+    
+    if bulk_lines:
+        try:
+            import pandas as pd
+            
+            queries, errors = parse_queries(bulk_lines, query_index)
+            results = convert_queries(queries, query_dimensions(queries))
+            st.dataframe(pd.DataFrame({
+                "Query": bulk_lines,
+                "Result": results,
+                "Unit": [query.to_unit if query else "" for query in queries],
+                "Error": [error or ("No rate available" if math.isnan(result) else "")
+                          for error, result in zip(errors, results)],
+            }))
+            
+        except Exception as e:
+            st.error(f"Error converting queries: {str(e)}")
+
+# Batch File Conversion
+elif conversion_type == "Batch File":
+    st.subheader("🗂️ Batch File Converter")
+    
+    batch_file = st.file_uploader("Upload a CSV or Parquet file", type=["csv", "parquet"])
+    
+    columns = []
+    if batch_file is not None:
+        try:
+            columns = read_columns(batch_file)
+        except ValueError as e:
+            st.error(str(e))
+    
+    if columns:
+        # Map each chosen column to its dimension and units
+        conversions = {}
+        for column in st.multiselect("Columns to convert:", columns):
+            col1, col2, col3 = st.columns(3)
+            dimension = col1.selectbox(f"{column}:", list(DIMENSIONS), key=f"dimension_{column}")
+            units = DIMENSIONS[dimension].units
+            from_unit = col2.selectbox("From:", units, key=f"from_{column}")
+            to_unit = col3.selectbox("To:", units, index=min(1, len(units) - 1), key=f"to_{column}")
+            conversions[column] = (dimension, from_unit, to_unit)
+        
+        batch_format = st.radio("Download format:", list(EXPORT_FORMATS), horizontal=True, format_func=str.upper)
+        
+        if conversions and st.button("Convert File"):
+            try:
+                # Converted one chunk at a time straight into a temp file
+                results_file, preview = spool_preview(convert_file(batch_file, conversions), batch_format)
+                with results_file:
+                    st.success(f"**Converted {len(conversions)} column(s)**")
+                    st.dataframe(preview)
+                    mime, suffix = EXPORT_FORMATS[batch_format]
+                    st.download_button("Download Converted File", data=results_file,
+                                       file_name=f"converted{suffix}", mime=mime, on_click="ignore")
+                
+            except Exception as e:
+                st.error(f"Error converting file: {str(e)}")
+
 st.markdown('</div>', unsafe_allow_html=True)
 
 # Footer
 st.markdown("---")
-st.caption("🔁 Universal Unit Converter | Instant conversions for currency, temperature, length, and weight")
\ No newline at end of file
+st.caption("🔁 Universal Unit Converter | Instant conversions for currency, temperature, length, weight, speed and more, one value or a whole file")
\ No newline at end of file
@@ -1,29 +1,57 @@
 
 
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+import rate_history
+from currency_rates import RATES_FILE, load_rates
+from rate_snapshot import SNAPSHOT_FILE, read_snapshot, snapshot_rates
+from unit_registry import convert_units, currency_dimension, factor
+
+
 # ----------------------------
-# STATIC EXCHANGE RATES (as of sample date)
+# EXCHANGE RATES
+# The latest rates saved by the live converter (rate_snapshot.bin) if
+# there are any, otherwise the sample rates in exchange_rates.json.
 # Base Currency: USD (1 USD = X)
 # ----------------------------
-EXCHANGE_RATES = {
-    "USD": 1.0,        # US Dollar
-    "EUR": 0.93,       # Euro
-    "GBP": 0.79,       # British Pound
-    "JPY": 156.0,      # Japanese Yen
-    "INR": 83.5,       # Indian Rupee
-    "CAD": 1.37,       # Canadian Dollar
-    "AUD": 1.53,       # Australian Dollar
-    "CHF": 0.90,       # Swiss Franc
-    "CNY": 7.25,       # Chinese Yuan
-}
+@st.cache_resource
+def get_currencies(mtimes):
+    """Precomputed currency-to-currency table and its date, rebuilt when either file changes."""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        fetched = datetime.fromtimestamp(snapshot.fetched).strftime("%Y-%m-%d %H:%M") if snapshot.fetched else "unknown"
+        return currency_dimension(snapshot_rates(snapshot)), f"saved live rates ({fetched})"
+    rates, rates_date = load_rates()
+    return currency_dimension(rates), f"static rates ({rates_date})"
+
+
+def file_mtime(path):
+    return path.stat().st_mtime if path.exists() else 0
+
+
+CURRENCIES, RATES_SOURCE = get_currencies((file_mtime(SNAPSHOT_FILE), file_mtime(RATES_FILE)))
+
+
+@st.cache_resource
+def get_history(size):
+    """Memory-mapped rate history, remapped whenever a day has been added."""
+    return rate_history.open_store()
+
+
+def history_size():
+    path = rate_history.HISTORY_DIR / rate_history.RATES_FILE
+    return path.stat().st_size if path.exists() else 0
 
 # ----------------------------
 # APP TITLE
 # ----------------------------
 st.set_page_config(page_title="💱 Currency Converter", page_icon="💱")
 st.title("💱 Simple Currency Converter")
-st.markdown("Convert between major currencies using static rates.")
+st.markdown(f"Convert between major currencies using {RATES_SOURCE}.")
 
 # ----------------------------
 # USER INPUTS
@@ -31,7 +59,7 @@ st.markdown("Convert between major currencies using static rates.")
 st.subheader("Enter Conversion")
 
 # Get list of currency codes
-currencies = list(EXCHANGE_RATES.keys())
+currencies = CURRENCIES.units
 
 col1, col2 = st.columns(2)
 
@@ -47,24 +75,49 @@ amount = st.number_input("Amount", min_value=0.0, value=1.0, step=0.01)
 # CONVERT & DISPLAY
 # ----------------------------
 if amount > 0:
-    # Convert to USD first, then to target currency
-    usd_amount = amount / EXCHANGE_RATES[from_currency]
-    converted_amount = usd_amount * EXCHANGE_RATES[to_currency]
+    # Direct lookup in the precomputed rate table, no trip through USD
+    converted_amount = convert_units(CURRENCIES, amount, from_currency, to_currency)
 
     st.subheader("🔁 Result")
     st.success(f"**{amount:,.2f} {from_currency}** = **{converted_amount:,.2f} {to_currency}**")
 
     # Show exchange rate used
-    rate = EXCHANGE_RATES[to_currency] / EXCHANGE_RATES[from_currency]
+    rate, _ = factor(CURRENCIES, from_currency, to_currency)
     st.caption(f"Exchange Rate: 1 {from_currency} = {rate:.4f} {to_currency}")
 else:
     st.info("Enter an amount greater than 0 to see conversion.")
 
+# ----------------------------
+# RATE HISTORY
+# ----------------------------
+st.subheader("📈 Rate History")
+history = get_history(history_size())
+
+if history is None or len(history.rates) == 0:
+    st.info("No rate history yet. Daily rates are recorded whenever the live converter fetches them.")
+elif from_currency not in history.index or to_currency not in history.index:
+    st.info(f"No history recorded for {from_currency}/{to_currency}.")
+else:
+    first_day, last_day = history.start, rate_history.last_day(history)
+
+    on_day = st.date_input("Value on date", value=last_day, min_value=first_day, max_value=last_day)
+    past_rate = rate_history.rate_on(history, on_day, from_currency, to_currency)
+    if np.isnan(past_rate):
+        st.warning(f"No rates were recorded on {on_day}.")
+    else:
+        st.success(f"On {on_day}: **{amount:,.2f} {from_currency}** = **{amount * past_rate:,.2f} {to_currency}**")
+
+    period = st.date_input("Trend between", value=(max(first_day, last_day - timedelta(days=365)), last_day),
+                           min_value=first_day, max_value=last_day)
+    if len(period) == 2:
+        days, values = rate_history.pair_history(history, from_currency, to_currency, *period)
+        st.line_chart(pd.Series(values, index=days, name=f"{from_currency} → {to_currency}"))
+
 # ----------------------------
 # FOOTER
 # ----------------------------
 st.divider()
-st.caption("ℹ️ Rates are static and for demonstration only. Not real-time.")
+st.caption("ℹ️ Rates are a saved snapshot and for demonstration only. Not real-time.")
 st.caption("✅ Built with Streamlit — Simple, Fast, Reliable")
 
 
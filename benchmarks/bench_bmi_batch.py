@@ -0,0 +1,67 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bmi_core import BMI_CATEGORIES, CATEGORY_COLUMN, count_summary, score_chunk, score_file
+from tabular_io import spool_export
+
+# Run with: python benchmarks/bench_bmi_batch.py [rows]
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+SCALAR_ROWS = 200_000
+
+rng = np.random.default_rng(0)
+frame = pd.DataFrame({
+    "patient_id": np.arange(N_ROWS),
+    "height_ft": rng.normal(5.6, 0.35, N_ROWS),
+    "weight_lb": rng.normal(170, 40, N_ROWS).clip(60),
+})
+
+
+def ladder(height, weight):
+    # The old way: one patient at a time, as the calculator page did
+    bmi = round(weight * 0.453592 / (height * 30.48 / 100) ** 2, 2)
+    if bmi < 18.5:
+        return "Underweight"
+    elif 18.5 <= bmi < 25:
+        return "Normal weight"
+    elif 25 <= bmi < 30:
+        return "Overweight"
+    return "Obese"
+
+
+start = time.perf_counter()
+scored = score_chunk(frame, "height_ft", "weight_lb", "feet", "lb")
+vectorized = time.perf_counter() - start
+print(f"in memory: {N_ROWS:,} patients in {vectorized:.2f} s ({N_ROWS / vectorized / 1e6:.1f}M rows/s)")
+
+subset = frame.iloc[:SCALAR_ROWS]
+start = time.perf_counter()
+categories = [ladder(h, w) for h, w in zip(subset["height_ft"].tolist(), subset["weight_lb"].tolist())]
+scalar = (time.perf_counter() - start) / SCALAR_ROWS * N_ROWS
+print(f"baseline: scalar if/elif ladder would take {scalar:.1f} s for {N_ROWS:,} rows (timed on {SCALAR_ROWS:,})")
+assert categories == scored[CATEGORY_COLUMN].iloc[:SCALAR_ROWS].astype(str).tolist()
+
+with tempfile.TemporaryDirectory() as tmp:
+    for fmt in ["parquet", "csv"]:
+        path = Path(tmp) / f"patients.{fmt}"
+        if fmt == "parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+
+        counts = np.zeros(len(BMI_CATEGORIES) + 1, dtype=np.int64)
+        start = time.perf_counter()
+        with spool_export(score_file(path, "height_ft", "weight_lb", "feet", "lb", counts=counts), fmt) as results:
+            size = results.seek(0, 2)
+        elapsed = time.perf_counter() - start
+        print(f"{fmt}: {path.stat().st_size / 1e6:.0f} MB in, {size / 1e6:.0f} MB scored file out in {elapsed:.1f} s "
+              f"({N_ROWS / elapsed / 1e6:.2f}M rows/s)")
+        assert counts.sum() == N_ROWS
+
+print(count_summary(counts).to_string(index=False))
@@ -0,0 +1,24 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calc_engine import BATCH_ERRORS, evaluate_columns
+
+# Run with: python benchmarks/bench_calc_batch.py
+ROW_COUNTS = [100_000, 1_000_000, 10_000_000]
+EXPRESSION = "(a + b) ^ 2 / (b - 1) + sqrt(a)"
+
+rng = np.random.default_rng(0)
+print(f"{'rows':>12} {'seconds':>8} {'rows/s':>14}  errors")
+for n in ROW_COUNTS:
+    columns = {"a": rng.uniform(-1, 10, n), "b": rng.integers(0, 4, n).astype(float)}
+    columns["a"][::1000] = np.nan  # unreadable cells
+    start = time.perf_counter()
+    _, codes = evaluate_columns(EXPRESSION, columns)
+    elapsed = time.perf_counter() - start
+    errors = {BATCH_ERRORS[code]: int(count) for code, count in enumerate(np.bincount(codes)) if code and count}
+    print(f"{n:>12,} {elapsed:>8.3f} {n / elapsed:>14,.0f}  {errors}")
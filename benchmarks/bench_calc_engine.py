@@ -0,0 +1,32 @@
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import calc_engine
+from calc_engine import evaluate, normalize
+
+# Run with: python benchmarks/bench_calc_engine.py
+EXPRESSIONS = [
+    "2 + 3 × 4",
+    "(a + b) ^ 2 / sqrt(c)",
+    "sin(x) ** 2 + cos(x) ** 2",
+    "log10(1000) * max(a, b, c) - floor(x / 3)",
+]
+VARIABLES = {"a": 3, "b": 4, "c": 16, "x": 1.25}
+NUMBER = 20_000
+
+
+def uncached(text):
+    # Bypass the LRU cache: parse, validate and compile every time
+    return calc_engine._compile.__wrapped__(normalize(text)).func(VARIABLES)
+
+
+print(f"{'expression':<44} {'uncached us':>12} {'cached us':>10} {'speedup':>8}")
+for text in EXPRESSIONS:
+    evaluate(text, VARIABLES)  # warm the cache
+    slow = timeit.timeit(lambda: uncached(text), number=NUMBER) / NUMBER * 1e6
+    fast = timeit.timeit(lambda: evaluate(text, VARIABLES), number=NUMBER) / NUMBER * 1e6
+    print(f"{text:<44} {slow:>12.2f} {fast:>10.2f} {slow / fast:>7.1f}x")
+print(calc_engine._compile.cache_info())
@@ -0,0 +1,55 @@
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import calc_history
+
+# Run with: python benchmarks/bench_calc_history.py
+ENTRIES = 100_000
+QUERIES = ["", "sqrt", "with x = 7", "no such calculation"]
+REPEAT = 20
+
+
+def timed(func, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1e3, result
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    conn = calc_history.open_history(str(Path(tmp) / "history.db"))
+    rng = random.Random(0)
+    now = datetime.now().isoformat(timespec="seconds")
+    calcs = [f"sqrt(x) * {rng.randint(1, 1000)} with x = {rng.randint(1, 100)}" if i % 2 else
+             f"{rng.random():.6f} + {rng.random():.6f}" for i in range(ENTRIES)]
+    start = time.perf_counter()
+    with conn:
+        conn.executemany("INSERT INTO history (calc, result, created_at) VALUES (?, ?, ?)",
+                         [(calc, "1.0", now) for calc in calcs])
+        conn.executemany("INSERT OR REPLACE INTO memo (calc, result) VALUES (?, ?)", [(calc, "1.0") for calc in calcs])
+    print(f"loaded {ENTRIES:,} entries in {time.perf_counter() - start:.2f} s")
+
+    ms, _ = timed(lambda: calc_history.recall(conn, calcs[ENTRIES // 2]), repeat=1000)
+    print(f"memo hit: {ms * 1e3:.1f} us")
+    ms, _ = timed(lambda: calc_history.record(conn, "1 + 1", 2), repeat=200)
+    print(f"record: {ms:.2f} ms")
+
+    print(f"{'query':<22} {'first page ms':>14} {'page 500 ms':>12}")
+    for query in QUERIES:
+        first, rows = timed(lambda: calc_history.search_history(conn, query))
+        # Walk 500 pages back, then time the next one
+        before = None
+        for _ in range(500):
+            page = calc_history.search_history(conn, query, before=before)
+            if not page:
+                break
+            before = page[-1][0]
+        deep, _ = timed(lambda: calc_history.search_history(conn, query, before=before))
+        print(f"{query!r:<22} {first:>14.2f} {deep:>12.2f}")
+    conn.close()
@@ -0,0 +1,43 @@
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Run with: python benchmarks/bench_import.py
+ROOT = Path(__file__).resolve().parent.parent
+RUNS = 5
+
+SAMPLE = """event,payer,amount,participants
+dinner,Asha,300,Asha;Ravi;Meena
+taxi,Ravi,90,Ravi;Meena;Asha
+hotel,Meena,1000,Meena;Asha
+"""
+
+
+def cold_start(args):
+    """Median wall time of a fresh interpreter running `args`."""
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+    f.write(SAMPLE)
+
+CASES = [
+    ("python (baseline)", ["-c", "pass"]),
+    ("import expense_core", ["-c", "import expense_core"]),
+    ("split --help", ["split.py", "--help"]),
+    ("split sample.csv", ["split.py", f.name]),
+    ("page imports", ["-c", "import streamlit, pandas, plotly.express, expense_core, expense_ledger"]),
+]
+
+print(f"{'case':<22} {'seconds':>8}")
+for label, args in CASES:
+    print(f"{label:<22} {cold_start(args):>8.3f}")
+Path(f.name).unlink()
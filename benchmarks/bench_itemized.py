@@ -0,0 +1,27 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from expense_core import split_items
+
+# Run with: python benchmarks/bench_itemized.py
+CASES = [(1_000, 50), (10_000, 200), (100_000, 1_000), (1_000_000, 5_000)]
+MAX_PARTICIPANTS = 8
+
+rng = np.random.default_rng(0)
+print(f"{'items':>10} {'people':>8} {'entries':>10} {'ms':>10}")
+for n_items, n_people in CASES:
+    counts = rng.integers(1, MAX_PARTICIPANTS, n_items)
+    rows = np.repeat(np.arange(n_items), counts)
+    people = rng.integers(0, n_people, len(rows))
+    weights = rng.uniform(0.5, 2.0, len(rows))
+    amounts = rng.integers(100, 50_000, n_items)
+
+    start = time.perf_counter()
+    split_items(amounts, rows, people, weights, n_people)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{n_items:>10} {n_people:>8} {len(rows):>10} {elapsed:>10.2f}")
@@ -0,0 +1,29 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from money import equal_balances
+
+# Run with: python benchmarks/bench_money.py
+GROUP_SIZES = [100, 10_000, 1_000_000]
+
+rng = random.Random(0)
+print(f"{'people':>10} {'float s':>10} {'int64 s':>10} {'float residue':>14} {'int64 residue':>14}")
+for n in GROUP_SIZES:
+    contributions = [round(rng.uniform(0, 5000), 2) for _ in range(n)]
+    total = round(sum(contributions), 2)
+
+    # The splitter's original float path
+    start = time.perf_counter()
+    share = total / n
+    float_balances = [round(share - c, 2) for c in contributions]
+    float_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    int_balances = equal_balances(total, contributions)
+    int_s = time.perf_counter() - start
+
+    print(f"{n:>10} {float_s:>10.4f} {int_s:>10.4f} {sum(float_balances):>14.4f} {int(int_balances.sum()):>14}")
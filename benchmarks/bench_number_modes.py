@@ -0,0 +1,53 @@
+import math
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calc_engine import NUMBER_MODES, evaluate, int_to_text, parse_number
+
+# Run with: python benchmarks/bench_number_modes.py
+# Whole numbers are Python ints in every mode; numbers with a fractional
+# part become float, Decimal (precision = twice the digits) or Fraction.
+DIGITS = [10, 100, 1_000, 10_000]
+OPERATIONS = ["a + b", "a * b", "a / b", "a ** 3"]
+TIME_BUDGET = 0.2
+
+
+def operand(rng, digits, fractional):
+    text = int_to_text(rng.randrange(10 ** (digits - 1), 10 ** digits))
+    return f"{text[:digits // 2]}.{text[digits // 2:]}" if fractional else text
+
+
+def per_call_us(func):
+    number, elapsed = timeit.Timer(func).autorange()
+    if elapsed < TIME_BUDGET:
+        elapsed = timeit.timeit(func, number=number) + elapsed
+        number *= 2
+    return elapsed / number * 1e6
+
+
+rng = random.Random(0)
+print(f"{'operands':<22} {'operation':<9}" + "".join(f"{mode + ' us':>14}" for mode in NUMBER_MODES))
+for fractional in (False, True):
+    for digits in DIGITS:
+        a_text, b_text = operand(rng, digits, fractional), operand(rng, digits, fractional)
+        label = f"{digits:,}-digit {'decimal' if fractional else 'integer'}"
+        for text in OPERATIONS:
+            cells = []
+            for mode in NUMBER_MODES:
+                env = {"a": parse_number(a_text, mode), "b": parse_number(b_text, mode)}
+                try:
+                    result = evaluate(text, env, mode, precision=2 * digits)
+                except ValueError:
+                    cells.append(f"{'too large':>14}")
+                    continue
+                if isinstance(result, float) and not math.isfinite(result):
+                    # Floats overflow past ~308 digits, so there is nothing to compare
+                    cells.append(f"{'inf':>14}")
+                    continue
+                us = per_call_us(lambda: evaluate(text, env, mode, precision=2 * digits))
+                cells.append(f"{us:>14.2f}")
+            print(f"{label:<22} {text:<9}" + "".join(cells))
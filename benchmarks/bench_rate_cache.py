@@ -0,0 +1,57 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from rate_cache import RateCache
+from rate_server import start_server
+from unit_registry import factor
+
+# Run with: python benchmarks/bench_rate_cache.py
+# The stand-in server sleeps DELAY seconds per request to act like a slow API
+DELAY = 0.3
+LOOKUPS = 1000
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1e3, result
+
+
+server, url = start_server(delay=DELAY)
+handler = server.RequestHandlerClass
+with tempfile.TemporaryDirectory() as tmp:
+    path = Path(tmp) / "rates.json"
+    cache = RateCache(url, path, ttl=0.5, history=None)
+
+    ms, _ = timed(lambda: cache.get("USD"))
+    print(f"cold (network): {ms:.1f} ms")
+    ms, _ = timed(lambda: [cache.get("USD") for _ in range(LOOKUPS)])
+    print(f"warm: {ms / LOOKUPS * 1e3:.1f} us per lookup")
+
+    restarted = RateCache(url, path, ttl=0.5, history=None)
+    ms, (_, stale) = timed(lambda: restarted.get("USD"))
+    print(f"after restart (from disk): {ms:.2f} ms, stale={stale}")
+
+    time.sleep(0.6)
+    served = handler.requests_served
+    ms, (entry, stale) = timed(lambda: restarted.get("USD"))
+    print(f"expired (served stale, refreshing): {ms:.2f} ms, stale={stale}")
+    for _ in range(50):
+        restarted.get("USD")
+    time.sleep(DELAY + 0.2)
+    new_entry, stale = restarted.get("USD")
+    print(f"after refresh: stale={stale}, refreshed={new_entry['fetched'] > entry['fetched']}, "
+          f"requests during refresh={handler.requests_served - served}")
+
+    # Every pair from the one USD table: one request instead of one per base
+    served = handler.requests_served
+    table, _, _ = restarted.table()
+    pairs = [(a, b) for a in table.units for b in table.units]
+    ms, _ = timed(lambda: [factor(table, a, b) for a, b in pairs])
+    print(f"{len(pairs)} cross rates: {ms:.2f} ms, requests={handler.requests_served - served}")
+server.shutdown()
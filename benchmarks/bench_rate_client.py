@@ -0,0 +1,75 @@
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from rate_cache import RateCache, RateClient
+from rate_server import start_server
+
+# Run with: python benchmarks/bench_rate_client.py
+REQUESTS = 200
+
+
+def timed(func):
+    start = time.perf_counter()
+    try:
+        result = func()
+    except requests.RequestException as e:
+        result = e
+    return (time.perf_counter() - start) * 1e3, result
+
+
+def unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+server, url = start_server()
+handler = server.RequestHandlerClass
+usd = url.format(base="USD")
+
+# Pooled session against a new connection per request
+client = RateClient()
+client.get_json(usd)
+pooled, _ = timed(lambda: [client.get_json(usd) for _ in range(REQUESTS)])
+fresh, _ = timed(lambda: [requests.get(usd, timeout=5).json() for _ in range(REQUESTS)])
+print(f"{REQUESTS} fetches: pooled {pooled / REQUESTS:.2f} ms each, new connection {fresh / REQUESTS:.2f} ms each")
+
+# Two 503s are absorbed by the retries
+handler.failures = 2
+served = handler.requests_served
+ms, result = timed(lambda: client.get_json(usd))
+print(f"2 failures then success: {ms:.0f} ms, ok={isinstance(result, dict)}, attempts={handler.requests_served - served}")
+
+# A read timeout gives up instead of hanging the page
+handler.delay = 1.0
+ms, result = timed(lambda: RateClient(timeout=(1, 0.2), retries=0).get_json(usd))
+print(f"slow upstream: gave up after {ms:.0f} ms ({type(result).__name__})")
+handler.delay = 0.0
+time.sleep(1.0)  # let the abandoned request finish
+
+# A failing upstream opens the breaker, after which calls fail at once
+breaker = RateClient(cooldown=0.5)
+handler.failures = 10 ** 6
+for i in range(4):
+    ms, result = timed(lambda: breaker.get_json(usd))
+    print(f"call {i + 1} while down: {ms:.2f} ms ({type(result).__name__})")
+handler.failures = 0
+time.sleep(0.5)
+ms, result = timed(lambda: breaker.get_json(usd))
+print(f"after cooldown: {ms:.2f} ms, ok={isinstance(result, dict)}")
+server.shutdown()
+
+# With no API and nothing cached, the shipped snapshot is used
+with tempfile.TemporaryDirectory() as tmp:
+    dead = f"http://127.0.0.1:{unused_port()}/v4/latest/{{base}}"
+    cache = RateCache(dead, Path(tmp) / "rates.json", client=RateClient(retries=0), history=None)
+    ms, (table, entry, stale) = timed(cache.table)
+    print(f"API down, cold cache: {ms:.1f} ms, snapshot={entry.get('snapshot_date')}, {len(table.units)} currencies")
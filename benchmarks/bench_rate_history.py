@@ -0,0 +1,74 @@
+import json
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import rate_history
+
+# Run with: python benchmarks/bench_rate_history.py
+YEARS = 30
+N_CURRENCIES = 160
+LOOKUPS = 100_000
+RANGES = 1000
+
+rng = np.random.default_rng(0)
+codes = ["USD"] + [f"C{i:02d}" for i in range(N_CURRENCIES - 1)]
+n_days = YEARS * 365
+start_day = date(1995, 1, 1)
+# Random-walk rates, one row per day
+table = np.exp(np.cumsum(rng.normal(0, 0.005, (n_days, N_CURRENCIES)), axis=0)) * rng.uniform(0.5, 200, N_CURRENCIES)
+table[:, 0] = 1.0
+
+with tempfile.TemporaryDirectory() as tmp:
+    store_path = Path(tmp) / "history"
+    # Seed all but the last year in one write, then time the append path
+    rate_history.append_rates(start_day, dict(zip(codes, table[0])), "USD", store_path)
+    columns = [codes.index(code) for code in rate_history.open_store(store_path).currencies]
+    with open(store_path / rate_history.RATES_FILE, "ab") as f:
+        table[1:-365, columns].tofile(f)
+    start = time.perf_counter()
+    for d in range(n_days - 365, n_days):
+        rate_history.append_rates(start_day + timedelta(days=d), dict(zip(codes, table[d])), "USD", store_path)
+    elapsed = time.perf_counter() - start
+    print(f"append: {elapsed / 365 * 1e3:.2f} ms per day "
+          f"({(store_path / rate_history.RATES_FILE).stat().st_size / 1e6:.0f} MB for {n_days:,} days x {N_CURRENCIES})")
+
+    start = time.perf_counter()
+    store = rate_history.open_store(store_path)
+    print(f"open (memory map): {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    days = [start_day + timedelta(days=int(d)) for d in rng.integers(0, n_days, LOOKUPS)]
+    pairs = rng.integers(0, N_CURRENCIES, (LOOKUPS, 2))
+    start = time.perf_counter()
+    for day, (i, j) in zip(days, pairs):
+        rate_history.rate_on(store, day, codes[i], codes[j])
+    elapsed = time.perf_counter() - start
+    print(f"random-date lookups: {elapsed / LOOKUPS * 1e6:.1f} us each")
+
+    start = time.perf_counter()
+    for d in rng.integers(0, n_days - 365, RANGES):
+        first = start_day + timedelta(days=int(d))
+        rate_history.pair_history(store, "C07", "C42", first, first + timedelta(days=364))
+    elapsed = time.perf_counter() - start
+    print(f"1-year pair slices: {elapsed / RANGES * 1e3:.3f} ms each")
+
+    start = time.perf_counter()
+    _, values = rate_history.pair_history(store, "C07", "C42")
+    print(f"full {YEARS}-year pair slice: {(time.perf_counter() - start) * 1e3:.1f} ms")
+    assert np.allclose(values, table[:, codes.index("C42")] / table[:, codes.index("C07")])
+
+    # Baseline: the same history as one JSON document of daily rate tables
+    json_path = Path(tmp) / "history.json"
+    json_path.write_text(json.dumps({
+        (start_day + timedelta(days=d)).isoformat(): dict(zip(codes, row)) for d, row in enumerate(table.tolist())
+    }))
+    start = time.perf_counter()
+    parsed = json.loads(json_path.read_text())
+    print(f"baseline: parsing the same history from JSON takes {(time.perf_counter() - start) * 1e3:.0f} ms "
+          f"({json_path.stat().st_size / 1e6:.0f} MB)")
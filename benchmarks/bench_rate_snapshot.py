@@ -0,0 +1,56 @@
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from currency_rates import load_rates
+from rate_snapshot import read_snapshot, snapshot_rates, write_snapshot
+
+# Run with: python benchmarks/bench_rate_snapshot.py
+N_CURRENCIES = 160
+LOADS = 10_000
+
+rng = np.random.default_rng(0)
+codes = ["USD"] + [chr(65 + i // 26 % 26) + chr(65 + i % 26) + "X" for i in range(N_CURRENCIES - 1)]
+rates = dict(zip(codes, [1.0] + rng.uniform(0.001, 20_000, N_CURRENCIES - 1).tolist()))
+
+
+def per_load(load):
+    start = time.perf_counter()
+    for _ in range(LOADS):
+        load()
+    return (time.perf_counter() - start) / LOADS * 1e6
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    snapshot_path = Path(tmp) / "rates.bin"
+    json_path = Path(tmp) / "rates.json"
+    write_snapshot(rates, "USD", 1_700_000_000, time.time(), snapshot_path)
+    json_path.write_text(json.dumps({"base": "USD", "date": "2024-01-01", "rates": rates}))
+
+    print(f"{N_CURRENCIES} currencies: binary {snapshot_path.stat().st_size:,} bytes, "
+          f"JSON {json_path.stat().st_size:,} bytes")
+    print(f"read_snapshot: {per_load(lambda: read_snapshot(snapshot_path)):.1f} us")
+    print(f"read_snapshot + rate dict: {per_load(lambda: snapshot_rates(read_snapshot(snapshot_path))):.1f} us")
+    print(f"baseline: load_rates from JSON: {per_load(lambda: load_rates(json_path)):.1f} us")
+    assert snapshot_rates(read_snapshot(snapshot_path)) == rates
+
+    start = time.perf_counter()
+    for _ in range(100):
+        write_snapshot(rates, "USD", 1_700_000_000, time.time(), snapshot_path)
+    print(f"write_snapshot (fsync + atomic replace): {(time.perf_counter() - start) / 100 * 1e3:.2f} ms")
+
+    # A flipped byte anywhere after the header fails the checksum
+    data = bytearray(snapshot_path.read_bytes())
+    data[-5] ^= 0xFF
+    snapshot_path.write_bytes(bytes(data))
+    assert read_snapshot(snapshot_path) is None
+    # So does a file cut short
+    snapshot_path.write_bytes(bytes(data[:len(data) // 2]))
+    assert read_snapshot(snapshot_path) is None
+    print("corrupt and truncated snapshots are rejected")
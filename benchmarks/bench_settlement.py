@@ -0,0 +1,28 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from expense_core import settle
+
+# Run with: python benchmarks/bench_settlement.py
+GROUP_SIZES = [10, 100, 1_000, 10_000, 100_000]
+
+
+def random_balances(n, seed=0):
+    rng = random.Random(seed)
+    contributions = [round(rng.uniform(0, 5000), 2) for _ in range(n)]
+    share = sum(contributions) / n
+    return [round(share - c, 2) for c in contributions]
+
+
+print(f"{'people':>8} {'transfers':>10} {'seconds':>10}")
+for n in GROUP_SIZES:
+    names = [f"Person {i + 1}" for i in range(n)]
+    balances = random_balances(n)
+    start = time.perf_counter()
+    transfers = settle(names, balances)
+    elapsed = time.perf_counter() - start
+    print(f"{n:>8} {len(transfers):>10} {elapsed:>10.4f}")
@@ -0,0 +1,51 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tabular_io import spool_export
+from unit_registry import convert_columns, convert_file
+
+# Run with: python benchmarks/bench_unit_batch.py [rows]
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+CONVERSIONS = {
+    "distance_ft": ("Length", "Feet", "Meters"),
+    "load_lb": ("Weight", "Pounds", "Kilograms"),
+    "temp_f": ("Temperature", "Fahrenheit", "Celsius"),
+}
+
+rng = np.random.default_rng(0)
+frame = pd.DataFrame({
+    "sensor": rng.integers(0, 1000, N_ROWS),
+    "distance_ft": rng.random(N_ROWS) * 500,
+    "load_lb": rng.random(N_ROWS) * 2000,
+    "temp_f": rng.normal(70, 15, N_ROWS),
+})
+
+start = time.perf_counter()
+convert_columns(frame, CONVERSIONS)
+elapsed = time.perf_counter() - start
+print(f"in memory: {N_ROWS:,} rows x {len(CONVERSIONS)} columns in {elapsed:.2f} s "
+      f"({N_ROWS * len(CONVERSIONS) / elapsed / 1e6:.0f}M values/s)")
+
+with tempfile.TemporaryDirectory() as tmp:
+    for fmt in ["parquet", "csv"]:
+        path = Path(tmp) / f"sensors.{fmt}"
+        start = time.perf_counter()
+        if fmt == "parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_csv(path, index=False)
+        written = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with spool_export(convert_file(path, CONVERSIONS), fmt) as results:
+            size = results.seek(0, 2)
+        elapsed = time.perf_counter() - start
+        print(f"{fmt}: input {path.stat().st_size / 1e6:.0f} MB (written in {written:.1f} s), "
+              f"converted to {size / 1e6:.0f} MB in {elapsed:.1f} s ({N_ROWS / elapsed / 1e6:.2f}M rows/s)")
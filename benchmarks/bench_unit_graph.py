@@ -0,0 +1,50 @@
+import math
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unit_registry import UnitGraph, register_units, LENGTH_UNITS
+
+# Run with: python benchmarks/bench_unit_graph.py
+N_UNITS = 5000
+PAIRS = 1000
+NUMBER = 100_000
+
+rng = np.random.default_rng(0)
+
+# A random tree of units, each defined against an earlier one, so paths
+# between two units run through several edges
+graph = UnitGraph()
+register_units(graph, "Length", LENGTH_UNITS, "Meters")
+sizes = dict(LENGTH_UNITS)
+names = list(LENGTH_UNITS)
+start = time.perf_counter()
+for n in range(N_UNITS):
+    parent = names[rng.integers(len(names))]
+    scale = float(rng.uniform(0.5, 2.0))
+    graph.add_unit("Length", f"U{n}", parent, scale)
+    sizes[f"U{n}"] = sizes[parent] * scale
+    names.append(f"U{n}")
+print(f"register {N_UNITS:,} units: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+pairs = [(names[i], names[j]) for i, j in rng.integers(0, len(names), (PAIRS, 2))]
+start = time.perf_counter()
+for a, b in pairs:
+    graph.transform(a, b)
+first = (time.perf_counter() - start) / PAIRS * 1e3
+print(f"first lookup towards a unit (search + compose): {first:.2f} ms")
+
+a, b = pairs[0]
+cached = timeit.timeit(lambda: graph.convert(3.0, a, b), number=NUMBER) / NUMBER * 1e6
+print(f"cached conversion: {cached:.2f} us")
+assert all(math.isclose(graph.convert(1.0, a, b), sizes[a] / sizes[b], rel_tol=1e-9) for a, b in pairs)
+
+start = time.perf_counter()
+dimension = graph.dimension("Length")
+print(f"dense {len(dimension.units):,} x {len(dimension.units):,} tables for arrays: "
+      f"{(time.perf_counter() - start) * 1e3:.0f} ms")
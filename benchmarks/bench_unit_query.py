@@ -0,0 +1,47 @@
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from currency_rates import load_rates
+from unit_query import build_index, convert_queries, convert_query, parse_queries, parse_query
+from unit_registry import DIMENSIONS, currency_dimension
+
+# Run with: python benchmarks/bench_unit_query.py
+NUMBER = 100_000
+N_LINES = 100_000
+
+rates, _ = load_rates()
+dimensions = {**DIMENSIONS, "Currency": currency_dimension(rates)}
+
+start = time.perf_counter()
+index = build_index(sorted(rates))
+print(f"build index: {(time.perf_counter() - start) * 1e3:.2f} ms ({len(index.units)} aliases)")
+
+for text in ["72F in C", "5 ft 11 in to cm", "$20 to EUR", "1,250.5 kilograms as lbs"]:
+    per_query = timeit.timeit(lambda: parse_query(text, index), number=NUMBER) / NUMBER * 1e6
+    print(f"parse {text!r}: {per_query:.1f} us")
+
+rng = np.random.default_rng(0)
+templates = ["{} ft {} in to cm", "{}F in C", "{} km to miles", "{} lbs to kg", "{} USD to INR", "{} oz in grams"]
+lines = [templates[i].format(*rng.integers(1, 100, 2)) for i in rng.integers(0, len(templates), N_LINES)]
+
+convert_queries(parse_queries(lines[:10], index)[0], dimensions)  # import pandas outside the timing
+start = time.perf_counter()
+queries, errors = parse_queries(lines, index)
+parsed = time.perf_counter() - start
+start = time.perf_counter()
+results = convert_queries(queries, dimensions)
+converted = time.perf_counter() - start
+print(f"bulk {N_LINES:,} lines: parse {parsed * 1e3:.0f} ms, convert {converted * 1e3:.0f} ms "
+      f"({(parsed + converted) / N_LINES * 1e6:.1f} us per line)")
+
+# Baseline: converting each parsed query on its own
+start = time.perf_counter()
+one_by_one = [convert_query(query, dimensions[query.dimension]) for query in queries]
+print(f"baseline: converting one query at a time takes {(time.perf_counter() - start) * 1e3:.0f} ms")
+assert not any(errors) and np.allclose(results, one_by_one)
@@ -0,0 +1,42 @@
+import sys
+import time
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from unit_registry import DIMENSIONS, LENGTH_UNITS, convert_units
+
+# Run with: python benchmarks/bench_units.py
+N_ROWS = 10_000_000
+NUMBER = 100_000
+
+length = DIMENSIONS["Length"]
+temperature = DIMENSIONS["Temperature"]
+
+
+def via_base(value, from_unit, to_unit):
+    # The old way: from-unit -> meters -> to-unit
+    return value * LENGTH_UNITS[from_unit] / LENGTH_UNITS[to_unit]
+
+
+scalar_old = timeit.timeit(lambda: via_base(3.0, "Miles", "Feet"), number=NUMBER) / NUMBER * 1e6
+scalar_new = timeit.timeit(lambda: convert_units(length, 3.0, "Miles", "Feet"), number=NUMBER) / NUMBER * 1e6
+print(f"single value: via base {scalar_old:.2f} us, memoized pair {scalar_new:.2f} us")
+
+rng = np.random.default_rng(0)
+values = rng.random(N_ROWS) * 100
+for label, dimension in [("length", length), ("temperature", temperature)]:
+    start = time.perf_counter()
+    convert_units(dimension, values, dimension.units[0], dimension.units[1])
+    one_pair = time.perf_counter() - start
+
+    units = np.array(dimension.units, dtype=object)
+    from_units = units[rng.integers(len(units), size=N_ROWS)]
+    to_units = units[rng.integers(len(units), size=N_ROWS)]
+    start = time.perf_counter()
+    convert_units(dimension, values, from_units, to_units)
+    per_row = time.perf_counter() - start
+    print(f"{N_ROWS:,} {label} values: one unit pair {one_pair:.3f} s, per-row unit names {per_row:.3f} s")
@@ -0,0 +1,83 @@
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from currency_rates import load_rates
+
+# Local stand-in for the exchange rate API, answering /v4/latest/<BASE>
+# from exchange_rates.json. It can be slowed down and made to fail, to
+# exercise timeouts, retries and the circuit breaker. Run with:
+#   python benchmarks/rate_server.py [port] [delay seconds] [failures]
+# then start the app with RATES_URL=http://127.0.0.1:<port>/v4/latest/{base}
+DEFAULT_PORT = 8765
+
+
+def make_handler(delay=0.0, failures=0):
+    """Request handler class; `failures` is how many requests get a 503 first.
+
+    Tests can change Handler.delay and Handler.failures while it runs.
+    """
+    rates, _ = load_rates()
+
+    class Handler(BaseHTTPRequestHandler):
+        # Keep connections open, as the real API does
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        requests_served = 0
+
+        def do_GET(self):
+            Handler.requests_served += 1
+            time.sleep(Handler.delay)
+            if Handler.failures:
+                Handler.failures -= 1
+                self.send_error(503, "Service unavailable")
+                return
+            base = self.path.rstrip("/").rsplit("/", 1)[-1].upper()
+            if not self.path.startswith("/v4/latest/") or base not in rates:
+                self.send_error(404, "Unknown base currency")
+                return
+            body = json.dumps({
+                "base": base,
+                "time_last_updated": int(time.time()),
+                "rates": {code: rate / rates[base] for code, rate in rates.items()},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    Handler.delay = delay
+    Handler.failures = failures
+    return Handler
+
+
+class RateServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that time out hang up mid-reply; that is expected here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(port=0, delay=0.0, failures=0):
+    """Serve in a background thread; returns (server, url template)."""
+    server = RateServer(("127.0.0.1", port), make_handler(delay, failures))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/v4/latest/{{base}}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    failures = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    server = RateServer(("127.0.0.1", port), make_handler(delay, failures))
+    print(f"Serving rates on http://127.0.0.1:{port}/v4/latest/<BASE> (delay {delay}s, first {failures} fail)")
+    server.serve_forever()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# pandas is imported inside the functions that need it, so the calculator
+# page does not pay for it until a file is scored
+from tabular_io import DEFAULT_CHUNKSIZE, iter_chunks
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# WHO classification: < 18.5, 18.5 – 24.9, 25.0 – 29.9, ≥ 30.0
+BMI_CUTOFFS = np.array([18.5, 25.0, 30.0])
+BMI_CATEGORIES = ["Underweight", "Normal weight", "Overweight", "Obese"]
+# Rows with a missing, non-numeric or non-positive height or weight
+INVALID_CATEGORY = "Invalid"
+
+# Columns added to each scored row
+BMI_COLUMN = "BMI"
+CATEGORY_COLUMN = "Category"
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def convert_to_metric(height, weight, h_unit, w_unit):
+    """Return (height in cm, weight in kg); works on single values and whole columns alike."""
+    height_cm = height * 30.48 if h_unit == "feet" else height
+    weight_kg = weight * 0.453592 if w_unit == "lb" else weight
+    return height_cm, weight_kg
+
+
+def compute_bmi(height_cm, weight_kg):
+    """BMI rounded to 2 decimals, as shown to the user; NaN where it cannot be computed."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.round(weight_kg / (height_cm / 100) ** 2, 2)
+    return np.where((height_cm > 0) & (weight_kg > 0), bmi, np.nan)
+
+
+def category_codes(bmi):
+    """Index into BMI_CATEGORIES for each BMI, or -1 where it is NaN.
+
+    np.digitize puts a value on a cut point in the higher category, so
+    18.5 is "Normal weight" and 25.0 is "Overweight", as in the table.
+    """
+    return np.where(np.isnan(bmi), -1, np.digitize(bmi, BMI_CUTOFFS))
+
+
+def score_chunk(chunk, height_column, weight_column, height_unit="cm", weight_unit="kg"):
+    """Return `chunk` with BMI and Category columns appended, computed one column at a time."""
+    import pandas as pd
+
+    missing = {height_column, weight_column} - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(map(str, missing)))}")
+    height = pd.to_numeric(chunk[height_column], errors="coerce").to_numpy(dtype=float)
+    weight = pd.to_numeric(chunk[weight_column], errors="coerce").to_numpy(dtype=float)
+    bmi = compute_bmi(*convert_to_metric(height, weight, height_unit, weight_unit))
+    categories = pd.Categorical.from_codes(category_codes(bmi), BMI_CATEGORIES)
+    return chunk.assign(**{BMI_COLUMN: bmi, CATEGORY_COLUMN: categories})
+
+
+def score_file(source, height_column, weight_column, height_unit="cm", weight_unit="kg",
+               fmt=None, chunksize=DEFAULT_CHUNKSIZE, counts=None):
+    """Yield scored chunks of a CSV/Parquet patient file; see score_chunk.
+
+    Only one chunk is in memory at a time, so the chunks can be streamed
+    straight into tabular_io.spool_export. If `counts` is given (an int
+    array of len(BMI_CATEGORIES) + 1) each chunk's category counts are
+    added to it, invalid rows in the last slot, so one pass over the file
+    gives both the per-patient file and the summary.
+    """
+    for chunk in iter_chunks(source, fmt, chunksize):
+        scored = score_chunk(chunk, height_column, weight_column, height_unit, weight_unit)
+        if counts is not None:
+            # Invalid rows have code -1, which wraps round to the last slot
+            counts += np.bincount(scored[CATEGORY_COLUMN].cat.codes.to_numpy() % len(counts),
+                                  minlength=len(counts))
+        yield scored
+
+
+def count_summary(counts):
+    """Category/Patients/Share table from the counts filled in by score_file."""
+    import pandas as pd
+
+    total = counts.sum()
+    return pd.DataFrame({
+        "Category": BMI_CATEGORIES + [INVALID_CATEGORY],
+        "Patients": counts,
+        "Share (%)": np.round(100 * counts / total, 1) if total else np.zeros(len(counts)),
+    })
@@ -0,0 +1,574 @@
+import ast
+import decimal
+import math
+import operator
+import re
+import sys
+from collections import namedtuple
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache, reduce
+
+import numpy as np
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+CACHE_SIZE = 1024
+
+# Powers whose result would need more bits than this are refused
+MAX_POWER_BITS = 1_000_000
+
+# factorial() refuses larger arguments; 25000! has about 99,000 digits, so
+# it can still be shown, and takes ~0.03 s
+MAX_FACTORIAL = 25_000
+
+# Significant digits kept by Decimal mode unless the caller asks otherwise
+DEFAULT_PRECISION = 28
+
+# Whole numbers with more digits than this are refused when read or shown
+# (conversion is quadratic, ~0.3 s at this size). Python's own limit of
+# 4300 digits is left alone; see int_to_text
+MAX_INT_DIGITS = 100_000
+MAX_INT_BITS = math.ceil(MAX_INT_DIGITS / math.log10(2))
+
+CONSTANTS = {
+    "pi": math.pi,
+    "e": math.e,
+    "tau": math.tau,
+}
+
+
+def safe_factorial(n):
+    """math.factorial(n), refusing arguments too large to compute quickly."""
+    if n > MAX_FACTORIAL:
+        raise ValueError(f"factorial() is limited to arguments up to {MAX_FACTORIAL:,}")
+    return math.factorial(n)
+
+
+FUNCTIONS = {
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "sqrt": math.sqrt,
+    "exp": math.exp,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "factorial": safe_factorial,
+}
+
+# NumPy versions of FUNCTIONS for batch mode; each works on whole columns
+VECTOR_FUNCTIONS = {
+    "abs": np.abs,
+    "round": np.round,
+    "min": lambda *args: reduce(np.minimum, args),
+    "max": lambda *args: reduce(np.maximum, args),
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": lambda x, base=None: np.log(x) if base is None else np.log(x) / np.log(base),
+    "log10": np.log10,
+    "log2": np.log2,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "floor": np.floor,
+    "ceil": np.ceil,
+}
+
+# Per-row error codes returned by batch evaluation
+BATCH_ERRORS = ["", "Invalid number", "Division by zero or overflow", "Undefined result"]
+INVALID_NUMBER, INFINITE_RESULT, UNDEFINED_RESULT = 1, 2, 3
+
+# Calculator symbols accepted in place of Python operators
+SYMBOLS = {"×": "*", "÷": "/", "^": "**", "−": "-"}
+
+# Parsing, compiling and evaluating all recurse once per level of the
+# expression tree; Python's recursion limit is reported as this
+TOO_DEEP = "Expression is too deeply nested"
+
+
+def safe_pow(a, b):
+    """a ** b, refusing exact (int or Fraction) powers too large to compute quickly."""
+    # An int to a negative power is a float, which is cheap; a Fraction stays exact
+    if isinstance(a, (int, Fraction)) and isinstance(b, int) and (b > 0 or isinstance(a, Fraction)):
+        size = max(abs(a.numerator), a.denominator)
+        if size > 1 and abs(b) * size.bit_length() > MAX_POWER_BITS:
+            raise ValueError("Result is too large")
+    result = operator.pow(a, b)
+    # A negative number to a fractional power, e.g. (-8) ** 0.5
+    if isinstance(result, complex):
+        raise ValueError("Undefined result")
+    return result
+
+
+BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: safe_pow,
+}
+
+UNARY_OPS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+CompiledExpression = namedtuple("CompiledExpression", ["text", "func", "variables"])
+
+
+# ----------------------------
+# NUMBER MODES
+# ----------------------------
+# Integers stay Python ints in every mode, so big-integer products and
+# powers run at native speed; only literals with a fraction or exponent
+# and the results of division become Decimal or Fraction
+NumberMode = namedtuple("NumberMode", ["parse", "constants", "functions", "binary_ops"])
+
+
+def _not_exact(name):
+    def func(*args):
+        raise ValueError(f"{name}() has no exact result; use Float or Decimal mode")
+    return func
+
+
+def _decimal_from_float(func):
+    """Wrap a float-only math function so it returns a Decimal."""
+    return lambda *args: Decimal(repr(func(*args)))
+
+
+def _decimal_log(x, base=None):
+    return Decimal(x).ln() if base is None else Decimal(x).ln() / Decimal(base).ln()
+
+
+def _decimal_pow(a, b):
+    # 2 ** -1 would give a float
+    return safe_pow(Decimal(a) if b < 0 else a, b)
+
+
+def _fraction_from_text(text):
+    """Fraction(text), read through Decimal, which has no digit limit."""
+    value = Decimal(text)
+    if not value.is_finite():
+        raise ValueError(f"Not a number: {text}")
+    return Fraction(value)
+
+
+def _fraction_pow(a, b):
+    if isinstance(b, Fraction) and b.denominator != 1:
+        raise ValueError("Fractional powers have no exact result; use Float or Decimal mode")
+    return safe_pow(Fraction(a) if b < 0 else a, int(b))
+
+
+# Functions that are exact for any rational argument
+EXACT_FUNCTIONS = ["abs", "round", "min", "max", "floor", "ceil", "factorial"]
+
+DECIMAL_FUNCTIONS = {
+    **{name: _decimal_from_float(func) for name, func in FUNCTIONS.items() if name not in EXACT_FUNCTIONS},
+    **{name: FUNCTIONS[name] for name in EXACT_FUNCTIONS},
+    "sqrt": lambda x: Decimal(x).sqrt(),
+    "exp": lambda x: Decimal(x).exp(),
+    "log": _decimal_log,
+    "log10": lambda x: Decimal(x).log10(),
+    "log2": lambda x: _decimal_log(x, 2),
+}
+
+FRACTION_FUNCTIONS = {
+    name: FUNCTIONS[name] if name in EXACT_FUNCTIONS else _not_exact(name) for name in FUNCTIONS
+}
+
+NUMBER_MODES = {
+    "Float": NumberMode(float, CONSTANTS, FUNCTIONS, BINARY_OPS),
+    "Decimal": NumberMode(
+        Decimal,
+        {name: Decimal(repr(value)) for name, value in CONSTANTS.items()},
+        DECIMAL_FUNCTIONS,
+        {**BINARY_OPS, ast.Div: lambda a, b: Decimal(a) / b, ast.Pow: _decimal_pow},
+    ),
+    "Fraction": NumberMode(
+        _fraction_from_text,
+        {},
+        FRACTION_FUNCTIONS,
+        {**BINARY_OPS, ast.Div: lambda a, b: Fraction(a) / b, ast.Pow: _fraction_pow},
+    ),
+}
+VECTOR_MODE = NumberMode(float, CONSTANTS, VECTOR_FUNCTIONS, BINARY_OPS)
+
+
+def _max_str_digits():
+    """Longest int the interpreter converts to or from text in one go."""
+    return sys.get_int_max_str_digits() or MAX_INT_DIGITS
+
+
+def int_to_text(n):
+    """str(n) for ints of up to MAX_INT_DIGITS digits, whatever the interpreter's limit.
+
+    Longer ints are split in halves with divmod until each piece is short
+    enough for str(). Raises ValueError above MAX_INT_DIGITS.
+    """
+    if n.bit_length() > MAX_INT_BITS:
+        raise ValueError(f"The result has more than {MAX_INT_DIGITS:,} digits")
+    if n < 0:
+        return "-" + int_to_text(-n)
+    # Below this many bits an int cannot have more digits than the limit
+    if n.bit_length() < (_max_str_digits() - 1) * 3.32:
+        return str(n)
+    half = int(n.bit_length() * math.log10(2)) // 2
+    high, low = divmod(n, 10 ** half)
+    return int_to_text(high) + int_to_text(low).zfill(half)
+
+
+def text_to_int(text):
+    """int(text) for up to MAX_INT_DIGITS digits; the inverse of int_to_text."""
+    digits = text.lstrip("+-")
+    if len(digits) > MAX_INT_DIGITS:
+        raise ValueError(f"Numbers can have at most {MAX_INT_DIGITS:,} digits")
+    if len(digits) <= _max_str_digits():
+        return int(text)
+    half = len(digits) // 2
+    value = text_to_int(digits[:-half]) * 10 ** half + text_to_int(digits[-half:])
+    return -value if text.startswith("-") else value
+
+
+def format_number(x):
+    """Text of a result as shown and kept in the history; see int_to_text."""
+    if isinstance(x, Fraction):
+        if x.denominator == 1:
+            return int_to_text(x.numerator)
+        return f"{int_to_text(x.numerator)}/{int_to_text(x.denominator)}"
+    if isinstance(x, int):
+        return int_to_text(x)
+    return str(x)
+
+
+def parse_number(text, number_mode="Float"):
+    """Read a typed number for `number_mode`; whole numbers always become ints.
+
+    "1/3" is accepted in every mode, so an exact result can be reused as an
+    operand.
+    """
+    text = text.strip().replace("_", "")
+    if re.fullmatch(r"[-+]?\d+", text):
+        return text_to_int(text)
+    parse = NUMBER_MODES[number_mode].parse
+    try:
+        if "/" in text:
+            fraction = Fraction(*(text_to_int(part.strip()) for part in text.split("/", 1)))
+            return parse(fraction.numerator) / fraction.denominator
+        return parse(text)
+    except (decimal.InvalidOperation, ZeroDivisionError):
+        raise ValueError(f"Not a number: {text}") from None
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def normalize(text):
+    """Canonical form of an expression, used as the cache key."""
+    for symbol, replacement in SYMBOLS.items():
+        text = text.replace(symbol, replacement)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _build(node, variables, mode=NUMBER_MODES["Float"]):
+    """Turn a validated AST node into a closure taking the variable dict."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # Decimal and Fraction modes attach the exact literal in _compile
+        value = getattr(node, "exact", node.value)
+        return lambda env: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in mode.constants:
+            value = mode.constants[name]
+            return lambda env: value
+        if name in CONSTANTS:
+            raise ValueError(f"'{name}' has no exact value; use Float or Decimal mode")
+        variables.add(name)
+
+        def lookup(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise ValueError(f"No value given for '{name}'") from None
+        return lookup
+
+    if isinstance(node, ast.BinOp) and type(node.op) in mode.binary_ops:
+        op = mode.binary_ops[type(node.op)]
+        left, right = _build(node.left, variables, mode), _build(node.right, variables, mode)
+        return lambda env: op(left(env), right(env))
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPS:
+        op = UNARY_OPS[type(node.op)]
+        operand = _build(node.operand, variables, mode)
+        return lambda env: op(operand(env))
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in mode.functions:
+            raise ValueError(f"Unknown function '{node.func.id}'")
+        func = mode.functions[node.func.id]
+        args = [_build(arg, variables, mode) for arg in node.args]
+        return lambda env: func(*[arg(env) for arg in args])
+
+    raise ValueError(f"Unsupported syntax: {ast.unparse(node)}")
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile(normalized, vectorized=False, number_mode="Float"):
+    try:
+        tree = ast.parse(normalized, mode="eval")
+    except SyntaxError:
+        raise ValueError(f"Invalid expression: {normalized}") from None
+    except RecursionError:
+        raise ValueError(TOO_DEEP) from None
+    mode = VECTOR_MODE if vectorized else NUMBER_MODES[number_mode]
+    if mode.parse is not float:
+        # Re-read literals from the source text, so 0.1 is exactly 0.1
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and type(node.value) is float:
+                node.exact = mode.parse(ast.get_source_segment(normalized, node))
+    variables = set()
+    try:
+        func = _build(tree.body, variables, mode)
+    except RecursionError:
+        raise ValueError(TOO_DEEP) from None
+    return CompiledExpression(normalized, func, frozenset(variables))
+
+
+def compile_expression(text, number_mode="Float"):
+    """Parse, validate and compile `text`; repeated expressions come from the cache.
+
+    Raises ValueError for anything that is not plain arithmetic on numbers,
+    variables, constants and the functions in FUNCTIONS.
+    """
+    return _compile(normalize(text), number_mode=number_mode)
+
+
+def evaluate(text, variables=None, number_mode="Float", precision=DEFAULT_PRECISION):
+    """Evaluate an expression with optional variable values.
+
+    `number_mode` is one of NUMBER_MODES; Decimal mode rounds to
+    `precision` significant digits. Bad arguments and overflows are
+    reported as ValueError; division by zero raises ZeroDivisionError as
+    in plain Python.
+    """
+    func = compile_expression(text, number_mode).func
+    try:
+        if number_mode != "Decimal":
+            return func(variables or {})
+        with decimal.localcontext() as context:
+            context.prec = precision
+            return func(variables or {})
+    except decimal.DivisionByZero:
+        raise ZeroDivisionError("division by zero") from None
+    except decimal.DecimalException:
+        raise ValueError("Undefined result") from None
+    except (TypeError, OverflowError) as e:
+        raise ValueError(str(e)) from None
+    except RecursionError:
+        raise ValueError(TOO_DEEP) from None
+
+
+def parse_assignments(text, number_mode="Float", precision=DEFAULT_PRECISION):
+    """Read "x=2, y=3.5" into {"x": 2, "y": 3.5}; values may be expressions."""
+    values = {}
+    # Split on commas outside parentheses, so "x=max(1, 2)" stays whole
+    for part in filter(None, (p.strip() for p in re.split(r"[;\n]|,(?![^()]*\))", text))):
+        name, sep, expr = part.partition("=")
+        name = name.strip()
+        if not sep or not name.isidentifier():
+            raise ValueError(f"Expected name=value, got '{part}'")
+        values[name] = evaluate(expr, values, number_mode, precision)
+    return values
+
+
+# ----------------------------
+# BATCH MODE
+# ----------------------------
+def column_variables(columns):
+    """Map column names to the variable names used for them in expressions."""
+    names = {}
+    for column in columns:
+        name = re.sub(r"\W+", "_", str(column).strip()).strip("_") or "col"
+        if name[0].isdigit():
+            name = f"c_{name}"
+        while name in names.values():
+            name += "_"
+        names[column] = name
+    return names
+
+
+def evaluate_columns(text, columns, n_rows=None):
+    """Evaluate `text` over whole columns in one vectorized NumPy pass.
+
+    `columns` maps variable names to equally long float arrays, with NaN for
+    cells that could not be read as numbers. Rows never raise: they come back
+    masked, with a code into BATCH_ERRORS saying why. `n_rows` is only
+    needed when the expression uses no columns at all.
+    Returns (masked result array, int8 error codes).
+    """
+    compiled = _compile(normalize(text), vectorized=True)
+    missing = compiled.variables - set(columns)
+    if missing:
+        raise ValueError(f"Unknown column(s): {', '.join(sorted(missing))}")
+
+    if n_rows is None:
+        n_rows = len(next(iter(columns.values()))) if columns else 1
+    env = {name: np.asarray(columns[name], dtype=float) for name in compiled.variables}
+    try:
+        with np.errstate(all="ignore"):
+            values = np.broadcast_to(np.asarray(compiled.func(env), dtype=float), (n_rows,)).copy()
+    except (TypeError, OverflowError) as e:
+        raise ValueError(str(e)) from None
+    except RecursionError:
+        raise ValueError(TOO_DEEP) from None
+
+    codes = np.zeros(n_rows, dtype=np.int8)
+    codes[np.isnan(values)] = UNDEFINED_RESULT
+    codes[np.isinf(values)] = INFINITE_RESULT
+    for column in env.values():
+        codes[np.isnan(column)] = INVALID_NUMBER
+    return np.ma.masked_array(values, mask=codes != 0), codes
+
+
+def evaluate_frame(text, frame):
+    """Evaluate `text` over a DataFrame's columns; see evaluate_columns.
+
+    Column names are turned into variables with column_variables and cells
+    that are not numbers count as invalid for their row. Returns a DataFrame
+    with a nullable Result column and an Error column.
+    """
+    import pandas as pd
+
+    variables = column_variables(frame.columns)
+    used = compile_expression(text).variables
+    columns = {
+        name: pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+        for column, name in variables.items() if name in used
+    }
+    values, codes = evaluate_columns(text, columns, n_rows=len(frame))
+    return pd.DataFrame({
+        "Result": pd.array(values.filled(np.nan), dtype="Float64"),
+        "Error": pd.Categorical.from_codes(codes, BATCH_ERRORS),
+    }, index=frame.index)
+
+
+# ----------------------------
+# PLOTTING
+# ----------------------------
+MAX_POINTS = 10_000_000
+
+# A step counts as a discontinuity when it is this many times the typical step
+JUMP_FACTOR = 50
+REFINE_POINTS = 32
+MAX_REFINED_INTERVALS = 1000
+
+
+def _evaluate_x(text, x):
+    values, _ = evaluate_columns(text, {"x": x}, n_rows=len(x))
+    return values.filled(np.nan)
+
+
+def sample_function(text, start, stop, step):
+    """Evaluate an expression in `x` on the grid start, start + step, ..., stop."""
+    if step <= 0 or stop <= start:
+        raise ValueError("The range needs start < stop and a positive step")
+    n_points = int(math.floor((stop - start) / step + 1e-9)) + 1
+    if n_points > MAX_POINTS:
+        raise ValueError(f"That is {n_points:,} points; please use at most {MAX_POINTS:,}")
+    unknown = compile_expression(text).variables - {"x"}
+    if unknown:
+        raise ValueError(f"Only x can be used as a variable, not {', '.join(sorted(unknown))}")
+    x = start + step * np.arange(n_points)
+    return x, _evaluate_x(text, x)
+
+
+def find_breaks(y):
+    """Indices i where the step from y[i] to y[i+1] looks discontinuous."""
+    finite = np.isfinite(y)
+    with np.errstate(invalid="ignore"):
+        dy = np.abs(np.diff(y))
+    typical = np.median(dy[np.isfinite(dy)]) if np.isfinite(dy).any() else 0.0
+    with np.errstate(invalid="ignore"):
+        jumps = dy > JUMP_FACTOR * max(typical, np.finfo(float).tiny)
+    return np.flatnonzero(jumps | (finite[:-1] != finite[1:]))
+
+
+def refine_breaks(text, x, y):
+    """Add REFINE_POINTS samples inside each interval that looks discontinuous.
+
+    Only the largest MAX_REFINED_INTERVALS breaks are refined, and all new
+    points are evaluated in one vectorized call.
+    """
+    breaks = find_breaks(y)
+    if len(breaks) == 0:
+        return x, y
+    if len(breaks) > MAX_REFINED_INTERVALS:
+        with np.errstate(invalid="ignore"):
+            size = np.nan_to_num(np.abs(y[breaks + 1] - y[breaks]), nan=np.inf)
+        breaks = breaks[np.argsort(-size, kind="stable")[:MAX_REFINED_INTERVALS]]
+
+    t = np.linspace(0, 1, REFINE_POINTS + 2)[1:-1]
+    extra_x = (x[breaks, None] + (x[breaks + 1] - x[breaks])[:, None] * t).ravel()
+    x = np.concatenate([x, extra_x])
+    y = np.concatenate([y, _evaluate_x(text, extra_x)])
+    order = np.argsort(x, kind="stable")
+    return x[order], y[order]
+
+
+def insert_gaps(x, y):
+    """Put a NaN across poles so the plotted line does not join them.
+
+    A pole is a break where the sign flips or a value is not finite; steep
+    but continuous stretches keep their line.
+    """
+    breaks = find_breaks(y)
+    with np.errstate(invalid="ignore"):
+        pole = (np.sign(y[breaks]) != np.sign(y[breaks + 1])) | ~np.isfinite(y[breaks] + y[breaks + 1])
+    breaks = breaks[pole] + 1
+    return np.insert(x, breaks, (x[breaks - 1] + x[breaks]) / 2), np.insert(y, breaks, np.nan)
+
+
+def minmax_decimate(x, y, n_bins=2000):
+    """Keep the lowest and highest point of each of `n_bins` equal slices.
+
+    The result has at most 3 * n_bins points but keeps every peak and dip,
+    so a line drawn through it looks the same as one through all points.
+    A slice holding a NaN gap marker (see insert_gaps) keeps one of them in
+    place, so the line still breaks there.
+    """
+    if len(x) <= 2 * n_bins:
+        return x, y
+    size = -(-len(x) // n_bins)
+    pad = n_bins * size - len(x)
+    xs = np.append(x, np.full(pad, np.nan)).reshape(n_bins, size)
+    ys = np.append(y, np.full(pad, np.nan)).reshape(n_bins, size)
+
+    lows = np.argmin(np.where(np.isnan(ys), np.inf, ys), axis=1)
+    highs = np.argmax(np.where(np.isnan(ys), -np.inf, ys), axis=1)
+    # Padding has no x; a gap marker has an x but no y
+    gaps = np.isnan(ys) & ~np.isnan(xs)
+    rows = np.arange(n_bins)
+    keep = np.zeros((n_bins, size), dtype=bool)
+    keep[rows, lows] = True
+    keep[rows, highs] = True
+    keep[rows, np.argmax(gaps, axis=1)] |= gaps.any(axis=1)
+    # Row-major masking keeps the chosen points in x order
+    out_x, out_y = xs[keep], ys[keep]
+    valid = ~np.isnan(out_x)
+    return out_x[valid], out_y[valid]
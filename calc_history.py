@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+HISTORY_FILE = "calc_history.db"
+PAGE_SIZE = 50
+
+# Every calculation is one history row; memo holds one row per distinct
+# calculation text so repeats are answered without evaluating again
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    calc TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS memo (
+    calc TEXT PRIMARY KEY,
+    result TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# The app shares one connection between all sessions, each on its own
+# thread; every use of a connection holds this lock, so one session's
+# transaction never takes in another's statements
+_lock = threading.Lock()
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def open_history(path=HISTORY_FILE):
+    """Open (and create if needed) the history database.
+
+    The connection may be shared between threads; the functions below
+    serialize their use of it.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Results are kept as the text they were displayed with, so exact Decimal
+# and Fraction results come back unchanged
+def _recall(conn, calc):
+    row = conn.execute("SELECT result FROM memo WHERE calc = ?", (calc,)).fetchone()
+    return None if row is None else row[0]
+
+
+def _record(conn, calc, result):
+    now = datetime.now().isoformat(timespec="seconds")
+    with conn:
+        conn.execute("INSERT INTO history (calc, result, created_at) VALUES (?, ?, ?)", (calc, str(result), now))
+        conn.execute("INSERT OR REPLACE INTO memo (calc, result) VALUES (?, ?)", (calc, str(result)))
+
+
+def recall(conn, calc):
+    """Return the memoized result text of `calc`, or None if it was never calculated."""
+    with _lock:
+        return _recall(conn, calc)
+
+
+def record(conn, calc, result):
+    """Add a calculation to the history and remember its result."""
+    with _lock:
+        _record(conn, calc, result)
+
+
+def calculate(conn, calc, compute):
+    """Return (result text, from_memo) for `calc`, calling `compute()` only on a memo miss.
+
+    Either way the calculation is added to the history. Errors raised by
+    `compute` are passed on and nothing is recorded. A hit is looked up
+    and recorded under one hold of the lock; `compute()` runs without it,
+    so a slow calculation does not hold up other sessions.
+    """
+    with _lock:
+        result = _recall(conn, calc)
+        if result is not None:
+            _record(conn, calc, result)
+            return result, True
+    result = str(compute())
+    record(conn, calc, result)
+    return result, False
+
+
+def search_history(conn, query="", before=None, limit=PAGE_SIZE):
+    """Return up to `limit` (id, calc, result, created_at) rows, newest first.
+
+    `query` matches anywhere in the calculation or result. Pages are keyed
+    on the id (pass the last id seen as `before`) rather than an OFFSET, so
+    later pages cost the same as the first one however long the history is.
+    """
+    pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    with _lock:
+        return conn.execute(
+            """SELECT id, calc, result, created_at FROM history
+               WHERE id < ? AND (calc LIKE ? ESCAPE '\\' OR result LIKE ? ESCAPE '\\')
+               ORDER BY id DESC LIMIT ?""",
+            (before if before is not None else 2 ** 63 - 1, pattern, pattern, limit)
+        ).fetchall()
+
+
+def clear_history(conn):
+    with _lock, conn:
+        conn.execute("DELETE FROM history")
+        conn.execute("DELETE FROM memo")
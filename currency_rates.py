@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Local rate snapshot standing in for a live rate source (1 base = X)
+RATES_FILE = Path(__file__).with_name("exchange_rates.json")
+
+DEFAULT_BASE_CURRENCY = "INR"
+
+CURRENCY_SYMBOLS = {
+    "INR": "₹",
+    "USD": "$",
+    "EUR": "€",
+    "GBP": "£",
+    "JPY": "¥",
+}
+
+
+def currency_symbol(code):
+    return CURRENCY_SYMBOLS.get(code, f"{code} ")
+
+
+def load_rates(path=RATES_FILE):
+    """Load a rate snapshot and return ({currency: rate}, date).
+
+    Rates are quoted against the snapshot's base currency, which is always
+    included with a rate of 1.
+    """
+    with open(path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    rates = {code.upper(): float(rate) for code, rate in snapshot["rates"].items()}
+    rates[snapshot["base"].upper()] = 1.0
+    return rates, snapshot.get("date")
+
+
+def convert(amounts, currencies, to_currency, rates):
+    """Convert amounts in mixed currencies to `to_currency`.
+
+    Rows are grouped by currency so there is one factor per currency and a
+    single vectorized multiply; blank currencies are taken as `to_currency`.
+    Raises ValueError if `rates` has no rate for one of the currencies.
+    """
+    import pandas as pd
+
+    if to_currency not in rates:
+        raise ValueError(f"No exchange rate for: {to_currency}")
+    amounts = np.asarray(amounts, dtype=float)
+    currencies = pd.Series(currencies, dtype=object).fillna(to_currency).astype(str).str.strip().str.upper()
+    currencies = currencies.replace("", to_currency)
+    codes, uniques = pd.factorize(currencies)
+    missing = [code for code in uniques if code not in rates]
+    if missing:
+        raise ValueError(f"No exchange rate for: {', '.join(missing)}")
+    factors = np.array([rates[to_currency] / rates[code] for code in uniques])
+    return amounts * factors[codes]
@@ -0,0 +1,295 @@
+import heapq
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+# pandas is imported inside the functions that need it, so importing this
+# module (and settling balances) stays fast for the CLI and scripts
+from currency_rates import DEFAULT_BASE_CURRENCY, convert, load_rates
+from money import MINOR_UNITS, allocate_items, to_minor
+from tabular_io import DEFAULT_CHUNKSIZE, iter_chunks
+
+# Columns expected in a bulk expense file; participants are separated by ";"
+# and may carry a weight after ":", e.g. "Asha:2;Ravi;Meena"
+BULK_COLUMNS = ["event", "payer", "amount", "participants"]
+# Optional column giving each amount's currency (blank means the base currency)
+CURRENCY_COLUMN = "currency"
+PARTICIPANT_SEP = ";"
+WEIGHT_SEP = ":"
+
+# Columns of a roster entered in table mode; Currency is optional
+ROSTER_COLUMNS = ["Name", "Contributed", "Currency"]
+
+# Label for the slice that groups everyone outside the top contributors
+OTHERS_LABEL = "Others"
+
+# Columns of an exported settlement plan
+TRANSFER_COLUMNS = ["Payer", "Receiver", "Amount"]
+
+
+# --- Roster ---
+def read_roster(source):
+    """Read a Name/Contributed[/Currency] roster from an uploaded CSV or pasted text.
+
+    Values may be separated by commas or tabs and the header row is optional.
+    A missing currency is left blank, meaning the group's base currency.
+    """
+    import pandas as pd
+
+    raw = pd.read_csv(source, sep=r"[,\t]", engine="python", header=None, dtype=str, skipinitialspace=True)
+    if raw.shape[1] < 2:
+        raise ValueError("Each line needs a name and a contribution")
+    raw = raw.iloc[:, :len(ROSTER_COLUMNS)]
+    raw.columns = ROSTER_COLUMNS[:raw.shape[1]]
+
+    # Drop the header row if the first contribution is not a number
+    if pd.isna(pd.to_numeric(raw["Contributed"].iloc[0], errors="coerce")):
+        raw = raw.iloc[1:]
+    if raw.empty:
+        raise ValueError("No people found in the roster")
+
+    roster = pd.DataFrame({
+        "Name": raw["Name"].fillna("").str.strip(),
+        "Contributed": pd.to_numeric(raw["Contributed"].str.strip(), errors="coerce").astype(float),
+        "Currency": raw["Currency"].fillna("").str.strip().str.upper() if "Currency" in raw else "",
+    }).reset_index(drop=True)
+    if roster["Contributed"].isna().any():
+        raise ValueError("Every contribution must be a number")
+    if (roster["Contributed"] < 0).any():
+        raise ValueError("Contributions must be non-negative")
+    return roster
+
+
+# --- Chart data ---
+def top_contributors(names, contributions, top_n):
+    """Keep the `top_n` largest contributors and fold the rest into "Others".
+
+    Uses np.argpartition, so picking the top N does not sort the whole group.
+    """
+    import pandas as pd
+
+    contributions = np.asarray(contributions, dtype=float)
+    if len(contributions) <= top_n:
+        return pd.DataFrame({"Name": list(names), "Contributed": contributions})
+
+    top = np.argpartition(-contributions, top_n - 1)[:top_n]
+    top = top[np.argsort(-contributions[top], kind="stable")]
+    others = contributions.sum() - contributions[top].sum()
+    return pd.DataFrame({
+        "Name": [names[i] for i in top] + [f"{OTHERS_LABEL} ({len(contributions) - top_n})"],
+        "Contributed": np.append(contributions[top], others),
+    })
+
+
+# --- Settlement ---
+def settle(names, balances):
+    """Turn per-person balances into a near-minimal list of transfers.
+
+    Uses the splitter's sign convention: a positive balance means the person
+    owes money, a negative balance means they should be paid back.
+    Returns a list of (payer, receiver, amount) tuples.
+    """
+    debts = {}
+    credits = {}
+    for i, balance in enumerate(balances):
+        cents = round(balance * MINOR_UNITS)
+        if cents > 0:
+            debts[i] = cents
+        elif cents < 0:
+            credits[i] = -cents
+
+    transfers = []
+
+    # Step 1: cancel debtors and creditors with exactly matching amounts
+    debtors_by_amount = defaultdict(list)
+    for i, cents in debts.items():
+        debtors_by_amount[cents].append(i)
+    for j in list(credits):
+        matches = debtors_by_amount.get(credits[j])
+        if matches:
+            i = matches.pop()
+            transfers.append((i, j, credits[j]))
+            del debts[i]
+            del credits[j]
+
+    # Step 2: greedily match the largest debtor with the largest creditor
+    debt_heap = [(-cents, i) for i, cents in debts.items()]
+    credit_heap = [(-cents, j) for j, cents in credits.items()]
+    heapq.heapify(debt_heap)
+    heapq.heapify(credit_heap)
+    while debt_heap and credit_heap:
+        owed, i = heapq.heappop(debt_heap)
+        due, j = heapq.heappop(credit_heap)
+        amount = min(-owed, -due)
+        transfers.append((i, j, amount))
+        if -owed > amount:
+            heapq.heappush(debt_heap, (owed + amount, i))
+        if -due > amount:
+            heapq.heappush(credit_heap, (due + amount, j))
+
+    return [(names[i], names[j], cents / MINOR_UNITS) for i, j, cents in transfers]
+
+
+# --- Itemized expenses ---
+def split_items(amounts, rows, people, weights, n_people):
+    """Share each item's amount (in minor units) among its participants by weight.
+
+    (rows, people, weights) are the non-zero entries of a sparse
+    item x person weight matrix. Each item is split exactly with the
+    largest remainder method and the shares are summed per person with a
+    bincount instead of a loop over items.
+    """
+    shares = allocate_items(amounts, rows, weights)
+    return np.bincount(people, weights=shares, minlength=n_people).astype(np.int64)
+
+
+def parse_participants(participants):
+    """Split "Asha:2;Ravi" cells into (row, name, weight) arrays.
+
+    Raises ValueError for a cell without any participant, a blank name, or
+    a weight that is empty, not a number or negative.
+    """
+    import pandas as pd
+
+    cells = participants.astype(str)
+    entries = cells.str.split(PARTICIPANT_SEP).explode().str.strip()
+    entries = entries[entries != ""]
+    empty = ~cells.index.isin(entries.index)
+    if empty.any():
+        raise ValueError(f"No participants in {cells[empty].iloc[0]!r}")
+    if entries.empty:
+        return entries.index.to_numpy(), entries, np.ones(0)
+
+    parts = entries.str.split(WEIGHT_SEP, n=1, expand=True)
+    names = parts[0].str.strip()
+    if (names == "").any():
+        raise ValueError(f"Missing participant name in {entries[names == ''].iloc[0]!r}")
+    if parts.shape[1] > 1:
+        given = parts[1].notna()
+        weights = pd.to_numeric(parts[1].str.strip(), errors="coerce")
+        bad = given & ~np.isfinite(weights.to_numpy(dtype=float))
+        if bad.any():
+            raise ValueError(f"Invalid participant weight in {entries[bad].iloc[0]!r}")
+        weights = weights.where(given, 1.0).to_numpy(dtype=float)
+    else:
+        weights = np.ones(len(names))
+    if np.any(weights < 0):
+        raise ValueError("Participant weights cannot be negative")
+    return entries.index.to_numpy(), names, weights
+
+
+def itemized_balances(items):
+    """Return (paid, owed) per person for a DataFrame of itemized expenses.
+
+    Each row needs a payer, an amount and its participants. Both sides are
+    returned in minor units.
+    """
+    import pandas as pd
+
+    missing = {"payer", "amount", "participants"} - set(items.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+    items = items.dropna(subset=["payer", "amount", "participants"]).reset_index(drop=True)
+    amounts = to_minor(items["amount"])
+    payers = items["payer"].astype(str).str.strip()
+    rows, names, weights = parse_participants(items["participants"])
+
+    # Index everybody who paid or took part, then build both sides at once
+    codes, people = pd.factorize(pd.concat([payers, names], ignore_index=True))
+    payer_codes, person_codes = codes[:len(payers)], codes[len(payers):]
+    paid = np.bincount(payer_codes, weights=amounts, minlength=len(people)).astype(np.int64)
+    owed = split_items(amounts, rows, person_codes, weights, len(people))
+    return pd.Series(paid, index=people), pd.Series(owed, index=people)
+
+
+# --- Bulk balances ---
+def chunk_balances(chunk, base=DEFAULT_BASE_CURRENCY, rates=None):
+    """Return (paid, owed) per person for one chunk of expense rows.
+
+    If the chunk has a currency column its amounts are first converted to
+    `base` with `rates`.
+    """
+    missing = set(BULK_COLUMNS) - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+    if CURRENCY_COLUMN in chunk.columns:
+        chunk = chunk.assign(amount=convert(chunk["amount"], chunk[CURRENCY_COLUMN], base, rates))
+    return itemized_balances(chunk)
+
+
+def summarize(paid, owed):
+    """Build the Name/Contributed/Share/Balance summary used by the splitter.
+
+    `paid` and `owed` are in minor units; the summary is in major units.
+    """
+    import pandas as pd
+
+    minor = pd.concat([paid.rename("Contributed"), owed.rename("Share")], axis=1)
+    minor = minor.fillna(0).astype(np.int64)
+    minor["Balance"] = minor["Share"] - minor["Contributed"]
+    df = (minor / MINOR_UNITS).rename_axis("Name").reset_index()
+    return df.sort_values("Name", ignore_index=True)
+
+
+def bulk_balances(source, fmt=None, chunksize=DEFAULT_CHUNKSIZE, base=DEFAULT_BASE_CURRENCY, rates=None):
+    """Compute per-person balances for every expense in a CSV/Parquet file.
+
+    The file is read in chunks and only the running per-person totals are
+    kept, so memory depends on the number of people, not the number of rows.
+    Amounts in other currencies are converted to `base`; the rate snapshot
+    is loaded once if `rates` is not given. An unknown `base` raises
+    ValueError before the file is read.
+    """
+    import pandas as pd
+
+    if rates is None:
+        rates, _ = load_rates()
+    if base not in rates:
+        raise ValueError(f"Unknown base currency: {base}")
+    paid = pd.Series(dtype=np.int64)
+    owed = pd.Series(dtype=np.int64)
+    for chunk in iter_chunks(source, fmt, chunksize, columns=BULK_COLUMNS + [CURRENCY_COLUMN]):
+        chunk_paid, chunk_owed = chunk_balances(chunk, base, rates)
+        paid = paid.add(chunk_paid, fill_value=0).astype(np.int64)
+        owed = owed.add(chunk_owed, fill_value=0).astype(np.int64)
+    return summarize(paid, owed)
+
+
+# --- Command line ---
+def main(argv=None):
+    """Headless split: python split.py expenses.csv > balances.csv"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="split",
+        description="Compute per-person balances (or a settlement plan) for a file of shared expenses."
+    )
+    parser.add_argument("source", help="CSV or Parquet file with columns " + ", ".join(BULK_COLUMNS) + "; '-' reads CSV from stdin")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="input format (default: from the file name)")
+    parser.add_argument("--base", default=DEFAULT_BASE_CURRENCY, help=f"currency to report in (default: {DEFAULT_BASE_CURRENCY})")
+    parser.add_argument("--rates", help="rate snapshot JSON to convert other currencies with")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows read per chunk")
+    parser.add_argument("--settle", action="store_true", help="print who pays whom instead of balances")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.source == "-" else args.source
+    try:
+        rates = load_rates(args.rates)[0] if args.rates else None
+        df = bulk_balances(source, args.format, args.chunksize, base=args.base.upper(), rates=rates)
+    except (OSError, ValueError) as e:
+        sys.exit(f"split: {e}")
+
+    if args.settle:
+        import csv
+
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        writer.writerow(TRANSFER_COLUMNS)
+        writer.writerows(settle(df["Name"].tolist(), df["Balance"].tolist()))
+    else:
+        df.to_csv(sys.stdout, index=False)
+
+
+if __name__ == "__main__":
+    main()
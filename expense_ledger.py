@@ -0,0 +1,203 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from currency_rates import DEFAULT_BASE_CURRENCY
+from expense_core import itemized_balances, summarize
+from money import MINOR_UNITS, to_minor
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+LEDGER_FILE = "expense_ledger.db"
+
+# Balances are copied to the snapshots table every this many expenses,
+# so rebuilding a group never replays more than this many rows
+SNAPSHOT_EVERY = 1000
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_name TEXT NOT NULL,
+    event TEXT,
+    payer TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    participants TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expenses_by_group ON expenses (group_name, id);
+
+CREATE TABLE IF NOT EXISTS balances (
+    group_name TEXT NOT NULL,
+    person TEXT NOT NULL,
+    paid INTEGER NOT NULL,
+    owed INTEGER NOT NULL,
+    PRIMARY KEY (group_name, person)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS groups (
+    group_name TEXT PRIMARY KEY,
+    expense_count INTEGER NOT NULL,
+    last_snapshot_id INTEGER NOT NULL,
+    currency TEXT NOT NULL DEFAULT '{DEFAULT_BASE_CURRENCY}'
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    group_name TEXT NOT NULL,
+    expense_id INTEGER NOT NULL,
+    person TEXT NOT NULL,
+    paid INTEGER NOT NULL,
+    owed INTEGER NOT NULL,
+    PRIMARY KEY (group_name, expense_id, person)
+) WITHOUT ROWID;
+"""
+
+# The app shares one connection between all sessions, each on its own
+# thread; every use of a connection holds this lock, so one session's
+# transaction never takes in another's statements
+_lock = threading.Lock()
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def open_ledger(path=LEDGER_FILE):
+    """Open (and create if needed) the ledger database.
+
+    The connection may be shared between threads; the functions below
+    serialize their use of it.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Ledgers created before groups had a currency were kept in the default one
+    if "currency" not in [row[1] for row in conn.execute("PRAGMA table_info(groups)")]:
+        conn.execute(f"ALTER TABLE groups ADD COLUMN currency TEXT NOT NULL DEFAULT '{DEFAULT_BASE_CURRENCY}'")
+    return conn
+
+
+def list_groups(conn):
+    with _lock:
+        return [row[0] for row in conn.execute("SELECT group_name FROM groups ORDER BY group_name")]
+
+
+def group_currency(conn, group):
+    """Currency a group's amounts are kept in, or None for a group with no expenses yet."""
+    with _lock:
+        row = conn.execute("SELECT currency FROM groups WHERE group_name = ?", (group,)).fetchone()
+    return row[0] if row else None
+
+
+def _apply(conn, group, paid, owed):
+    """Add per-person paid/owed deltas (minor units) to the running balances."""
+    deltas = pd.concat([paid.rename("paid"), owed.rename("owed")], axis=1).fillna(0).astype("int64")
+    conn.executemany(
+        """INSERT INTO balances (group_name, person, paid, owed) VALUES (?, ?, ?, ?)
+           ON CONFLICT (group_name, person)
+           DO UPDATE SET paid = paid + excluded.paid, owed = owed + excluded.owed""",
+        [(group, person, int(row.paid), int(row.owed)) for person, row in deltas.iterrows()]
+    )
+
+
+def _snapshot(conn, group, expense_id):
+    """Copy a group's balances to the snapshots table, replacing its older snapshots."""
+    conn.execute(
+        """INSERT INTO snapshots (group_name, expense_id, person, paid, owed)
+           SELECT group_name, ?, person, paid, owed FROM balances WHERE group_name = ?""",
+        (expense_id, group)
+    )
+    conn.execute("UPDATE groups SET last_snapshot_id = ? WHERE group_name = ?", (expense_id, group))
+    # Only the latest snapshot is ever replayed from
+    conn.execute("DELETE FROM snapshots WHERE group_name = ? AND expense_id < ?", (group, expense_id))
+
+
+def add_expenses(conn, group, expenses, currency=DEFAULT_BASE_CURRENCY):
+    """Append expenses to a group's ledger and update its running balances.
+
+    `expenses` is a DataFrame with payer, amount and participants (and an
+    optional event) in the bulk file format, with amounts in the group's
+    currency. `currency` is only recorded when the group is created. Only
+    the people involved in the new expenses are touched, never the group's
+    history.
+    """
+    expenses = expenses.dropna(subset=["payer", "amount", "participants"])
+    if expenses.empty:
+        return
+    paid, owed = itemized_balances(expenses)
+    now = datetime.now().isoformat(timespec="seconds")
+    rows = zip(
+        expenses["event"] if "event" in expenses else [None] * len(expenses),
+        expenses["payer"].astype(str).str.strip(),
+        to_minor(expenses["amount"]).tolist(),
+        expenses["participants"].astype(str)
+    )
+
+    with _lock, conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO groups (group_name, expense_count, last_snapshot_id, currency) VALUES (?, 0, 0, ?)",
+            (group, currency)
+        )
+        conn.executemany(
+            "INSERT INTO expenses (group_name, event, payer, amount, participants, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            [(group, event, payer, amount, participants, now) for event, payer, amount, participants in rows]
+        )
+        _apply(conn, group, paid, owed)
+
+        conn.execute(
+            "UPDATE groups SET expense_count = expense_count + ? WHERE group_name = ?", (len(expenses), group)
+        )
+        count, = conn.execute("SELECT expense_count FROM groups WHERE group_name = ?", (group,)).fetchone()
+        if count // SNAPSHOT_EVERY > (count - len(expenses)) // SNAPSHOT_EVERY:
+            last_id, = conn.execute("SELECT MAX(id) FROM expenses WHERE group_name = ?", (group,)).fetchone()
+            _snapshot(conn, group, last_id)
+
+
+def add_expense(conn, group, event, payer, amount, participants, currency=DEFAULT_BASE_CURRENCY):
+    """Append a single expense; see add_expenses."""
+    add_expenses(conn, group, pd.DataFrame([{
+        "event": event, "payer": payer, "amount": amount, "participants": participants
+    }]), currency)
+
+
+def group_balances(conn, group):
+    """Return the Name/Contributed/Share/Balance summary for a group.
+
+    Reads the running balances only, so it costs the same however long the
+    group's history is.
+    """
+    with _lock:
+        df = pd.read_sql_query(
+            "SELECT person, paid, owed FROM balances WHERE group_name = ?", conn, params=(group,), index_col="person"
+        )
+    return summarize(df["paid"], df["owed"])
+
+
+def rebuild_balances(conn, group):
+    """Recompute a group's balances from its latest snapshot plus later expenses.
+
+    The replay is bounded by SNAPSHOT_EVERY rows, however old the group is;
+    a group without a snapshot yet is replayed from its first expense.
+    Raises ValueError for a group that has no expenses.
+    """
+    with _lock, conn:
+        row = conn.execute("SELECT last_snapshot_id FROM groups WHERE group_name = ?", (group,)).fetchone()
+        if row is None:
+            raise ValueError(f"No expenses in group '{group}'")
+        snapshot_id, = row
+        conn.execute("DELETE FROM balances WHERE group_name = ?", (group,))
+        conn.execute(
+            """INSERT INTO balances (group_name, person, paid, owed)
+               SELECT group_name, person, paid, owed FROM snapshots
+               WHERE group_name = ? AND expense_id = ?""",
+            (group, snapshot_id)
+        )
+        replay = pd.read_sql_query(
+            "SELECT payer, amount, participants FROM expenses WHERE group_name = ? AND id > ? ORDER BY id",
+            conn, params=(group, snapshot_id)
+        )
+        if not replay.empty:
+            # Stored amounts are already in minor units
+            replay["amount"] = replay["amount"] / MINOR_UNITS
+            _apply(conn, group, *itemized_balances(replay))
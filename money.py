@@ -0,0 +1,69 @@
+import numpy as np
+
+# All amounts are stored as int64 minor units (paise/cents)
+MINOR_UNITS = 100
+
+
+def to_minor(amounts):
+    """Convert major-unit amounts (₹12.34) to an int64 array of minor units (1234)."""
+    return np.rint(np.asarray(amounts, dtype=float) * MINOR_UNITS).astype(np.int64)
+
+
+def to_major(minor):
+    """Convert minor units back to major-unit floats for display."""
+    return np.asarray(minor, dtype=np.int64) / MINOR_UNITS
+
+
+def allocate(total, weights):
+    """Split an int `total` by `weights` with the largest remainder method.
+
+    Everyone first gets the floor of their exact quota, then the leftover
+    units go one each to the largest fractional parts (earlier entries win
+    ties), so the parts always sum to `total` exactly.
+    """
+    weights = np.asarray(weights, dtype=float)
+    quotas = total * weights / weights.sum()
+    parts = np.floor(quotas).astype(np.int64)
+    leftover = int(total - parts.sum())
+    if leftover:
+        order = np.argsort(-(quotas - parts), kind="stable")
+        parts[order[:leftover]] += 1
+    return parts
+
+
+def allocate_items(totals, rows, weights):
+    """Largest remainder allocation for many items at once.
+
+    `rows` maps each entry to its item in `totals` and `weights` gives its
+    weight within that item. Returns the int share of every entry; the
+    shares of each item sum exactly to its total.
+    """
+    totals = np.asarray(totals, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+    weight_totals = np.bincount(rows, weights=weights, minlength=len(totals))
+    if np.any(weight_totals <= 0):
+        raise ValueError("Every item needs at least one participant with a positive weight")
+
+    quotas = totals[rows] * weights / weight_totals[rows]
+    parts = np.floor(quotas).astype(np.int64)
+    leftover = totals - np.bincount(rows, weights=parts, minlength=len(totals)).astype(np.int64)
+
+    # Rank entries within each item by fractional part, largest first.
+    # Folding both keys into one float sorts much faster than np.lexsort.
+    order = np.argsort(rows + (1.0 - (quotas - parts)) / 2, kind="stable")
+    sorted_rows = rows[order]
+    counts = np.bincount(rows, minlength=len(totals))
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(order)) - starts[sorted_rows]
+    parts[order[rank < leftover[sorted_rows]]] += 1
+    return parts
+
+
+def equal_balances(total, contributions):
+    """Balances (share minus contribution) in minor units for an equal split.
+
+    The shares come from `allocate`, so they add up to `total` to the paisa.
+    """
+    paid = to_minor(contributions)
+    shares = allocate(int(to_minor(total)), np.ones(len(paid)))
+    return shares - paid
@@ -0,0 +1,219 @@
+import os
+import random
+import threading
+import time
+from datetime import date
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_history
+from currency_rates import load_rates
+from rate_snapshot import SNAPSHOT_FILE, read_snapshot, snapshot_rates, write_snapshot
+from unit_registry import currency_dimension
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# "{base}" is replaced by the currency the rates are quoted against. Point
+# RATES_URL at a local stand-in (benchmarks/rate_server.py) for testing.
+RATES_URL = os.environ.get("RATES_URL", "https://api.exchangerate-api.com/v4/latest/{base}")
+# The one table fetched for cross rates; every other pair is derived from it
+FETCH_BASE = "USD"
+
+# Rates younger than this are served without asking the API
+RATE_TTL = 60 * 60
+
+# Seconds to wait for a connection, then for each read, before giving up
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 5
+# Connections kept open to the API, shared by all script threads
+POOL_SIZE = 10
+# Extra attempts after a failed request; waits are random up to
+# RETRY_BACKOFF * 2 ** attempt seconds, so clients do not retry in step
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.25
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# After this many failed fetches in a row the API is not called for
+# BREAKER_COOLDOWN seconds; then one trial request decides
+BREAKER_THRESHOLD = 3
+BREAKER_COOLDOWN = 30
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an API that has been failing."""
+
+
+class RateClient:
+    """Pooled HTTP client with timeouts, jittered retries and a circuit breaker.
+
+    One instance is meant to be shared, so every fetch reuses the same
+    connections and sees the same breaker state.
+    """
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=MAX_RETRIES, backoff=RETRY_BACKOFF,
+                 threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+
+    def _allow(self):
+        with self.lock:
+            if self.failures < self.threshold:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                # Half open: let this one request through, keep the rest out
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def _record(self, ok):
+        with self.lock:
+            if ok:
+                self.failures = 0
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+
+    def get_json(self, url):
+        """GET `url` and return its JSON body.
+
+        Connection errors, timeouts and 429/5xx replies are retried; other
+        HTTP errors are raised at once and do not count against the API.
+        """
+        if not self._allow():
+            raise CircuitOpenError("Rate service is unavailable; not retrying for now")
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+                continue
+            if response.status_code in RETRY_STATUSES:
+                error = requests.HTTPError(f"{response.status_code} from rate service", response=response)
+                continue
+            response.raise_for_status()
+            self._record(True)
+            return response.json()
+        self._record(False)
+        raise error
+
+
+class RateCache:
+    """Exchange rates per base currency, kept fresh for `ttl` seconds.
+
+    The latest fetch is saved as a binary snapshot at `path`, so a restart
+    starts warm without touching the network. Once an entry is
+    older than the TTL it is still returned straight away while a background
+    thread fetches a new one (stale-while-revalidate); only a base currency
+    that was never fetched waits for the network.
+    """
+
+    def __init__(self, url=RATES_URL, path=SNAPSHOT_FILE, ttl=RATE_TTL, client=None, history=rate_history.HISTORY_DIR):
+        self.url = url
+        self.path = Path(path)
+        # Every fetched table is also kept as that day's row in the rate history
+        self.history = history
+        self.ttl = ttl
+        self.client = client or RateClient()
+        self.lock = threading.Lock()
+        # Serialises saving to disk only, so conversions never wait on it
+        self.save_lock = threading.Lock()
+        self.refreshing = set()
+        self.entries = self._load()
+        # base -> (entry, cross-rate Dimension built from it)
+        self.tables = {}
+
+    def _load(self):
+        snapshot = read_snapshot(self.path)
+        if snapshot is None:
+            return {}
+        return {snapshot.base: {
+            "rates": snapshot_rates(snapshot), "updated": snapshot.updated, "fetched": snapshot.fetched or 0.0,
+        }}
+
+    def fetch(self, base):
+        """Fetch `base` rates from the API and store them; returns the new entry."""
+        data = self.client.get_json(self.url.format(base=base))
+        entry = {
+            "rates": {code.upper(): float(rate) for code, rate in data["rates"].items()},
+            "updated": data.get("time_last_updated"),
+            "fetched": time.time(),
+        }
+        with self.lock:
+            self.entries[base] = entry
+        # Saving is a bonus; never fail a conversion over it
+        with self.save_lock:
+            try:
+                write_snapshot(entry["rates"], base, entry["updated"], entry["fetched"], self.path)
+            except (OSError, ValueError):
+                pass
+            if self.history is not None:
+                try:
+                    rate_history.append_rates(date.today(), entry["rates"], base, self.history)
+                except (OSError, ValueError):
+                    pass
+        return entry
+
+    def _refresh(self, base):
+        try:
+            self.fetch(base)
+        except (requests.RequestException, ValueError, KeyError):
+            pass  # keep serving the stale entry; the next request tries again
+        finally:
+            with self.lock:
+                self.refreshing.discard(base)
+
+    def get(self, base):
+        """Return (entry, is_stale) for `base`, where entry has rates/updated/fetched.
+
+        A stale entry triggers one background refresh. Raises
+        requests.RequestException (or ValueError for a bad reply) only when
+        there is nothing cached for `base` yet.
+        """
+        with self.lock:
+            entry = self.entries.get(base)
+            stale = entry is not None and time.time() - entry["fetched"] > self.ttl
+            if stale and base not in self.refreshing:
+                self.refreshing.add(base)
+                threading.Thread(target=self._refresh, args=(base,), daemon=True).start()
+        if entry is None:
+            try:
+                entry = self.fetch(base)
+            except KeyError:
+                raise ValueError("Unexpected reply from the rate service") from None
+        return entry, stale
+
+    def table(self, base=FETCH_BASE):
+        """Return (cross-rate Dimension, entry, is_stale) from the single `base` table.
+
+        Every currency pair is a lookup in the same precomputed matrix, so one
+        request covers all of them and a refresh swaps in all pairs at once.
+        The matrix is only rebuilt after a refresh has replaced the entry.
+        If nothing was ever fetched and the API cannot be reached, the rate
+        snapshot shipped with the app is used; its entry has a
+        "snapshot_date" key.
+        """
+        try:
+            entry, stale = self.get(base)
+        except (requests.RequestException, ValueError):
+            rates, date = load_rates()
+            entry, stale = {"rates": rates, "updated": None, "fetched": None, "snapshot_date": date}, True
+        cached = self.tables.get(base)
+        if cached is None or cached[0] is not entry:
+            cached = (entry, currency_dimension(entry["rates"]))
+            self.tables[base] = cached
+        return cached[1], entry, stale
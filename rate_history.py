@@ -0,0 +1,152 @@
+import json
+import os
+from collections import namedtuple
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# A store is a folder holding meta.json (base currency, first day, column
+# order) and rates.f64, a dense row-major float64 array with one row per
+# day and one column per currency (1 base = rate, NaN where unknown).
+# Rows are fixed width, so appending a day is a plain file append and any
+# slice maps straight into memory without parsing.
+HISTORY_DIR = Path(__file__).with_name("rate_history")
+META_FILE = "meta.json"
+RATES_FILE = "rates.f64"
+DTYPE = np.float64
+
+Store = namedtuple("Store", ["path", "base", "start", "currencies", "index", "rates"])
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def _write_meta(path, base, start, currencies):
+    tmp = path / (META_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"base": base, "start": start.isoformat(), "currencies": currencies}, f)
+    os.replace(tmp, path / META_FILE)
+
+
+def open_store(path=HISTORY_DIR):
+    """Map a store read-only; returns None if nothing has been recorded yet.
+
+    Opening costs the same however many days are stored: rows are only
+    read from disk when a slice of them is used.
+    """
+    path = Path(path)
+    try:
+        with open(path / META_FILE, encoding="utf-8") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    currencies = meta["currencies"]
+    row_bytes = len(currencies) * np.dtype(DTYPE).itemsize
+    n_days = (path / RATES_FILE).stat().st_size // row_bytes
+    if n_days:
+        rates = np.memmap(path / RATES_FILE, dtype=DTYPE, mode="r", shape=(n_days, len(currencies)))
+    else:
+        rates = np.empty((0, len(currencies)), dtype=DTYPE)
+    return Store(path, meta["base"], date.fromisoformat(meta["start"]), currencies,
+                 {code: i for i, code in enumerate(currencies)}, rates)
+
+
+def last_day(store):
+    return store.start + timedelta(days=len(store.rates) - 1) if len(store.rates) else None
+
+
+def _add_currencies(store, new):
+    """Rewrite the array with extra columns; only happens when a new currency appears."""
+    currencies = store.currencies + sorted(new)
+    widened = np.full((len(store.rates), len(currencies)), np.nan, dtype=DTYPE)
+    widened[:, :len(store.currencies)] = store.rates
+    tmp = store.path / (RATES_FILE + ".tmp")
+    widened.tofile(tmp)
+    os.replace(tmp, store.path / RATES_FILE)
+    _write_meta(store.path, store.base, store.start, currencies)
+
+
+def append_rates(day, rates, base, path=HISTORY_DIR):
+    """Record one day's {currency: rate} table, quoted as 1 `base` = rate.
+
+    Days after the last stored one are appended (missing days in between
+    become NaN rows); an already stored day is overwritten in place. Rates
+    are re-quoted to the store's base currency if `base` differs.
+    """
+    path = Path(path)
+    rates = {code.upper(): float(rate) for code, rate in rates.items()}
+    rates[base.upper()] = 1.0
+    store = open_store(path)
+    if store is None:
+        path.mkdir(parents=True, exist_ok=True)
+        (path / RATES_FILE).touch()
+        _write_meta(path, base.upper(), day, sorted(rates))
+        store = open_store(path)
+    if store.base != base.upper():
+        if store.base not in rates:
+            raise ValueError(f"Rates quoted in {base} do not include the store's base {store.base}")
+        pivot = rates[store.base]
+        rates = {code: rate / pivot for code, rate in rates.items()}
+
+    new = set(rates) - set(store.currencies)
+    if new:
+        _add_currencies(store, new)
+        store = open_store(path)
+
+    offset = (day - store.start).days
+    if offset < 0:
+        raise ValueError(f"{day} is before the first stored day ({store.start})")
+    row = np.full(len(store.currencies), np.nan, dtype=DTYPE)
+    for code, rate in rates.items():
+        row[store.index[code]] = rate
+
+    row_bytes = row.nbytes
+    with open(path / RATES_FILE, "r+b") as f:
+        n_days = len(store.rates)
+        if offset < n_days:
+            f.seek(offset * row_bytes)
+        else:
+            # Drop any half-written row left by a crash, then pad the gap
+            f.truncate(n_days * row_bytes)
+            f.seek(0, os.SEEK_END)
+            np.full((offset - n_days, len(store.currencies)), np.nan, dtype=DTYPE).tofile(f)
+        row.tofile(f)
+
+
+def _day_index(store, day):
+    offset = (day - store.start).days
+    if not 0 <= offset < len(store.rates):
+        raise ValueError(f"No rates stored for {day}")
+    return offset
+
+
+def _columns(store, from_currency, to_currency):
+    missing = [code for code in (from_currency, to_currency) if code not in store.index]
+    if missing:
+        raise ValueError(f"No history for: {', '.join(missing)}")
+    return store.index[from_currency], store.index[to_currency]
+
+
+def rate_on(store, day, from_currency, to_currency):
+    """Rate of 1 `from_currency` in `to_currency` on `day` (NaN if not recorded)."""
+    i, j = _columns(store, from_currency, to_currency)
+    row = store.rates[_day_index(store, day)]
+    return float(row[j] / row[i])
+
+
+def pair_history(store, from_currency, to_currency, start=None, end=None):
+    """Daily rates of 1 `from_currency` in `to_currency` from `start` to `end` inclusive.
+
+    Returns (datetime64 days, float rates); only the rows in the range are
+    read from disk.
+    """
+    i, j = _columns(store, from_currency, to_currency)
+    first = 0 if start is None else _day_index(store, max(start, store.start))
+    last = len(store.rates) - 1 if end is None else _day_index(store, min(end, last_day(store)))
+    block = store.rates[first:last + 1]
+    days = np.datetime64(store.start, "D") + np.arange(first, last + 1)
+    return days, block[:, j] / block[:, i]
@@ -0,0 +1,107 @@
+import math
+import os
+import struct
+import sys
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# Latest fetched rate table, kept so a fresh start can convert offline
+SNAPSHOT_FILE = Path(__file__).with_name("rate_snapshot.bin")
+
+# Layout (little-endian): a 32-byte header, then one float64 rate per
+# currency, then the 3-letter currency codes. The header holds the magic,
+# format version, currency count, base currency, the API's update time and
+# our fetch time (NaN if unknown), and a CRC32 of everything after it.
+MAGIC = b"RTSN"
+VERSION = 1
+HEADER = struct.Struct("<4sHH3sxddI")
+CODE_LENGTH = 3
+
+Snapshot = namedtuple("Snapshot", ["base", "currencies", "rates", "updated", "fetched"])
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def encode_snapshot(rates, base, updated=None, fetched=None):
+    """Pack a {currency: rate} table (1 base = rate) into the snapshot format."""
+    codes = sorted(rates)
+    if any(len(code) != CODE_LENGTH or not code.isascii() for code in codes + [base]):
+        raise ValueError("Currency codes must be 3 ASCII letters")
+    body = np.array([rates[code] for code in codes], dtype="<f8").tobytes() + "".join(codes).encode("ascii")
+    header = HEADER.pack(MAGIC, VERSION, len(codes), base.encode("ascii"),
+                         math.nan if updated is None else float(updated),
+                         math.nan if fetched is None else float(fetched),
+                         zlib.crc32(body))
+    return header + body
+
+
+def decode_snapshot(data):
+    """Unpack snapshot bytes; raises ValueError if they are not a valid snapshot."""
+    if len(data) < HEADER.size:
+        raise ValueError("Rate snapshot is truncated")
+    magic, version, n, base, updated, fetched, checksum = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a rate snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported rate snapshot version {version}")
+    body = memoryview(data)[HEADER.size:]
+    if len(body) != n * (8 + CODE_LENGTH) or zlib.crc32(body) != checksum:
+        raise ValueError("Rate snapshot is corrupt")
+    rates = np.frombuffer(body, dtype="<f8", count=n)
+    codes = bytes(body[8 * n:]).decode("ascii")
+    currencies = [codes[i:i + CODE_LENGTH] for i in range(0, len(codes), CODE_LENGTH)]
+    return Snapshot(base.decode("ascii"), currencies, rates,
+                    None if math.isnan(updated) else updated, None if math.isnan(fetched) else fetched)
+
+
+def write_snapshot(rates, base, updated=None, fetched=None, path=SNAPSHOT_FILE):
+    """Atomically replace the snapshot at `path`.
+
+    The new file is written and synced under a temporary name first, so
+    readers only ever see the old snapshot or the complete new one.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(encode_snapshot(rates, base, updated, fetched))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path=SNAPSHOT_FILE):
+    """Load the snapshot at `path`; None if there is none or it is unusable."""
+    try:
+        with open(path, "rb") as f:
+            return decode_snapshot(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_rates(snapshot):
+    """The snapshot's rates as a {currency: rate} dict."""
+    return dict(zip(snapshot.currencies, snapshot.rates.tolist()))
+
+
+def main():
+    """Fetch the live rate table once and save it, e.g. while building an image."""
+    import requests
+
+    from rate_cache import FETCH_BASE, RateCache
+
+    try:
+        entry = RateCache(history=None).fetch(FETCH_BASE)
+    except (requests.RequestException, ValueError, KeyError) as e:
+        sys.exit(f"rate_snapshot: {e}")
+    print(f"Saved {len(entry['rates'])} {FETCH_BASE} rates to {SNAPSHOT_FILE.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# Command-line expense splitter: python split.py expenses.csv [--settle]
+from expense_core import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import io
+import os
+import tempfile
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Rows of an exported file shown on the page before it is downloaded
+PREVIEW_ROWS = 1000
+
+# Download metadata per export format
+EXPORT_FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def detect_format(source):
+    """Guess "csv" or "parquet" from a path or an uploaded file's name."""
+    name = str(getattr(source, "name", source)).lower()
+    return "parquet" if name.endswith((".parquet", ".pq")) else "csv"
+
+
+def iter_chunks(source, fmt=None, chunksize=DEFAULT_CHUNKSIZE, columns=None):
+    """Yield DataFrames of at most `chunksize` rows from a CSV or Parquet source.
+
+    Only one chunk is held in memory at a time, so callers that fold each
+    chunk into a running result keep memory flat regardless of file size.
+    `columns` limits what is read; names missing from the file are skipped
+    so callers can check for required columns themselves.
+    """
+    fmt = fmt or detect_format(source)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        if columns is not None:
+            columns = [c for c in columns if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "csv":
+        import pandas as pd
+
+        usecols = None if columns is None else (lambda c: c in columns)
+        yield from pd.read_csv(source, chunksize=chunksize, usecols=usecols)
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def read_columns(source, fmt=None):
+    """Column names of an uploaded CSV/Parquet file, leaving it rewound for the real read.
+
+    Raises ValueError if the file is empty, has no rows or cannot be read.
+    """
+    import pandas as pd
+
+    try:
+        # pandas and pyarrow parse errors are all ValueErrors
+        first = next(iter_chunks(source, fmt, chunksize=5), None)
+    except pd.errors.EmptyDataError:
+        raise ValueError("The file is empty") from None
+    except ValueError as e:
+        raise ValueError(f"Could not read the file: {e}") from None
+    finally:
+        source.seek(0)
+    if first is None or first.empty:
+        raise ValueError("The file has no rows")
+    return list(first.columns)
+
+
+def iter_frames(df, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield row slices of `df`; an empty frame still yields once so headers get written."""
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def write_chunks(frames, fileobj, fmt="csv"):
+    """Write an iterable of DataFrames to a binary file object one chunk at a time."""
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    # Dictionary encoding rarely pays off for floats and is
+                    # most of the write time on measurement columns
+                    dictionary = [f.name for f in table.schema if not pa.types.is_floating(f.type)]
+                    writer = pq.ParquetWriter(fileobj, table.schema, use_dictionary=dictionary)
+                elif not table.schema.equals(writer.schema, check_metadata=False):
+                    # CSV chunks can infer different types for the same column
+                    try:
+                        table = table.cast(writer.schema)
+                    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                        raise ValueError(f"Column types changed between chunks: {e}") from None
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+    elif fmt == "csv":
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        for i, frame in enumerate(frames):
+            frame.to_csv(text, index=False, header=(i == 0))
+        text.flush()
+        text.detach()
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+# Windows only deletes a file once every handle to it is closed; asking
+# for that up front is the only way to remove a spool that is still open
+TEMPORARY_FLAG = getattr(os, "O_TEMPORARY", 0)
+
+
+def spool_export(frames, fmt="csv"):
+    """Write frames to a temp file and return it opened for reading from the start.
+
+    The result is a plain io.BufferedReader, which st.download_button
+    accepts. Peak memory stays at one chunk, and the file is removed once
+    closed.
+    """
+    fd, path = tempfile.mkstemp()
+    try:
+        with open(fd, "wb") as fileobj:
+            write_chunks(frames, fileobj, fmt)
+        reader = open(os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0) | TEMPORARY_FLAG), "rb")
+    except BaseException:
+        os.unlink(path)
+        raise
+    if not TEMPORARY_FLAG:
+        # Elsewhere an open file can simply lose its name
+        os.unlink(path)
+    return reader
+
+
+def spool_preview(frames, fmt="csv", rows=PREVIEW_ROWS):
+    """spool_export plus the first `rows` rows of the result; returns (file, preview).
+
+    The file is rewound for st.download_button, which reads it during the
+    call, so callers can close (and so delete) it in a `with` block right
+    after. Raises ValueError if there is nothing to export.
+    """
+    results = spool_export(frames, fmt)
+    try:
+        preview = next(iter_chunks(results, fmt, chunksize=rows), None)
+        if preview is None:
+            raise ValueError("There are no rows to export")
+        results.seek(0)
+    except BaseException:
+        results.close()
+        raise
+    return results, preview
@@ -0,0 +1,214 @@
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from currency_rates import CURRENCY_SYMBOLS
+from unit_registry import DIMENSIONS, convert_units
+
+# ----------------------------
+# CONFIGURATION
+# ----------------------------
+# Everything a unit may be typed as, besides its own name (in lower case;
+# queries are matched case-insensitively)
+UNIT_ALIASES = {
+    "Length": {
+        "Meters": ["m", "meter", "metre", "metres"],
+        "Kilometers": ["km", "kilometer", "kilometre", "kilometres"],
+        "Centimeters": ["cm", "centimeter", "centimetre", "centimetres"],
+        "Millimeters": ["mm", "millimeter", "millimetre", "millimetres"],
+        "Miles": ["mi", "mile"],
+        "Yards": ["yd", "yds", "yard"],
+        "Feet": ["ft", "foot", "'", "′"],
+        "Inches": ["in", "inch", '"', "″"],
+        "Nautical Miles": ["nmi", "nautical mile"],
+    },
+    "Weight": {
+        "Grams": ["g", "gm", "gram"],
+        "Kilograms": ["kg", "kgs", "kilo", "kilos", "kilogram"],
+        "Milligrams": ["mg", "milligram"],
+        "Pounds": ["lb", "lbs", "pound"],
+        "Ounces": ["oz", "ounce"],
+        "Tons": ["t", "ton", "tonne", "tonnes"],
+    },
+    "Temperature": {
+        "Celsius": ["c", "°c", "degc", "centigrade"],
+        "Fahrenheit": ["f", "°f", "degf"],
+        "Kelvin": ["k", "kelvins"],
+    },
+    "Time": {
+        "Seconds": ["s", "sec", "secs", "second"],
+        "Minutes": ["min", "mins", "minute"],
+        "Hours": ["h", "hr", "hrs", "hour"],
+        "Days": ["day"],
+    },
+    "Speed": {
+        "Meters per second": ["m/s", "mps"],
+        "Kilometers per hour": ["km/h", "kmh", "kph"],
+        "Miles per hour": ["mi/h", "mph"],
+        "Feet per second": ["ft/s", "fps"],
+        "Knots": ["kn", "kt", "knot"],
+    },
+    "Area Density": {
+        "Kilograms per square meter": ["kg/m²", "kg/m2", "kg/m^2"],
+        "Pounds per square inch": ["lb/in²", "lb/in2", "lb/in^2"],
+        "Grams per square centimeter": ["g/cm²", "g/cm2", "g/cm^2"],
+    },
+}
+
+# Words and arrows between the amount and the unit wanted
+SEPARATORS = ["to", "in", "into", "as", "->", "→", "="]
+
+NUMBER = r"[-+]?(?:\d[\d,]*(?:\.\d*)?|\.\d+)(?:e[-+]?\d+)?"
+
+# A parsed query: the amount is the sum of `parts`, each (value, unit),
+# all in the same dimension, converted to `to_unit`
+Query = namedtuple("Query", ["dimension", "parts", "to_unit"])
+QueryIndex = namedtuple("QueryIndex", ["units", "symbols", "tokens"])
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+def _trie_pattern(words):
+    """Regex matching any of `words`, factored into a trie of shared prefixes.
+
+    "ft|foot|feet" becomes "f(?:eet|oot|t)", so the regex engine follows one
+    branch per character instead of trying every alias in turn. Longer words
+    are preferred; the caller's lookahead backs off to shorter ones.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def pattern(node):
+        branches = [re.escape(char) + pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?" if len(branches) == 1 and len(branches[0]) > 1 else body + "?"
+        return body
+
+    return pattern(trie)
+
+
+def build_index(currencies=()):
+    """Precompile the alias table and regexes for every unit and `currencies` code.
+
+    Build it once and reuse it; every query is then a single regex scan
+    plus dictionary lookups.
+    """
+    units = {}
+    table = {dimension: {unit: [unit] + aliases for unit, aliases in names.items()}
+             for dimension, names in UNIT_ALIASES.items()}
+    table["Currency"] = {code: [code] for code in currencies}
+    # Symbols such as "$" may also come before the amount
+    symbols = set()
+    for code in currencies:
+        if code in CURRENCY_SYMBOLS and len(CURRENCY_SYMBOLS[code].strip()) == 1:
+            symbols.add(CURRENCY_SYMBOLS[code])
+            table["Currency"][code].append(CURRENCY_SYMBOLS[code])
+    for dimension, names in table.items():
+        for unit, aliases in names.items():
+            for alias in aliases:
+                alias = alias.lower()
+                if units.setdefault(alias, (dimension, unit)) != (dimension, unit):
+                    raise ValueError(f"'{alias}' is both {units[alias][1]} and {unit}")
+
+    # A word must not run on into letters: "5 ft" is feet, "5 fathoms" is not
+    words = f"(?:{_trie_pattern(set(units) | set(SEPARATORS))})(?:(?<![a-z])|(?![a-z]))"
+    tokens = rf"\s*(?:({NUMBER})|({words})|(\S))"
+    return QueryIndex(units, symbols, re.compile(tokens))
+
+
+def parse_query(text, index):
+    """Parse "5 ft 11 in to cm", "72F in C" or "$20 to EUR" into a Query.
+
+    One precompiled regex splits the text into numbers and known words,
+    which are then read left to right, so parsing never backtracks.
+    Raises ValueError if the text is not a conversion query.
+    """
+    # Aliases are stored in lower case, so the regex need not ignore case
+    tokens = index.tokens.findall(text.lower())
+    if (len(tokens) < 3 or any(other for _, _, other in tokens)
+            or tokens[-2][1] not in SEPARATORS or tokens[-1][1] not in index.units):
+        raise ValueError(f"Not a conversion: {text.strip()!r} (try e.g. '5 ft 11 in to cm')")
+    dimension, to_unit = index.units[tokens[-1][1]]
+    parts = []
+    tokens, i = tokens[:-2], 0
+    while i < len(tokens):
+        # [currency symbol] number [unit]
+        unit = tokens[i][1] if tokens[i][1] in index.symbols else None
+        i += unit is not None
+        if i == len(tokens) or not tokens[i][0]:
+            raise ValueError(f"Expected a number in {text.strip()!r}")
+        value = tokens[i][0]
+        i += 1
+        if i < len(tokens) and tokens[i][1] in index.units:
+            unit = tokens[i][1]
+            i += 1
+        if unit is None:
+            raise ValueError(f"No unit given for {value}")
+        part_dimension, unit = index.units[unit]
+        if part_dimension != dimension:
+            raise ValueError(f"Cannot convert {part_dimension.lower()} to {dimension.lower()}")
+        parts.append((float(value.replace(",", "")), unit))
+    if len(parts) > 1 and dimension in DIMENSIONS and DIMENSIONS[dimension].offset.any():
+        raise ValueError(f"{dimension}s cannot be added together")
+    return Query(dimension, tuple(parts), to_unit)
+
+
+def parse_queries(lines, index):
+    """Parse many queries; returns (queries, errors) with None/"" in the failed/ok slots."""
+    queries, errors = [], []
+    for line in lines:
+        try:
+            queries.append(parse_query(line, index))
+            errors.append("")
+        except ValueError as e:
+            queries.append(None)
+            errors.append(str(e))
+    return queries, errors
+
+
+def convert_query(query, dimension):
+    """Amount of a parsed query in its target unit, given its Dimension."""
+    return sum(convert_units(dimension, value, unit, query.to_unit) for value, unit in query.parts)
+
+
+def convert_queries(queries, dimensions):
+    """Convert parsed queries (None entries allowed) to a float array, NaN where unknown.
+
+    All parts of one dimension are converted in a single NumPy pass with
+    per-row unit codes, then summed back per query.
+    """
+    results = np.full(len(queries), np.nan)
+    grouped = {}
+    for row, query in enumerate(queries):
+        if query is not None:
+            grouped.setdefault(query.dimension, []).append(row)
+    for name, rows in grouped.items():
+        if name not in dimensions:
+            continue
+        dimension = dimensions[name]
+        index = dimension.index
+        # Unknown units get code -1 and are masked out below
+        parts = [(row, value, index.get(unit, -1), index.get(queries[row].to_unit, -1))
+                 for row in rows for value, unit in queries[row].parts]
+        part_rows, values, i, j = (np.array(column) for column in zip(*parts))
+        converted = values * dimension.scale[i, j] + dimension.offset[i, j]
+        converted[(i < 0) | (j < 0)] = np.nan
+        totals = np.bincount(part_rows, weights=converted, minlength=len(queries))
+        results[rows] = totals[rows]
+    return results
+
+
+def format_parts(query):
+    return " ".join(f"{value:g} {unit}" for value, unit in query.parts)
+
+
+UNIT_INDEX = build_index()
@@ -0,0 +1,295 @@
+from collections import deque, namedtuple
+
+import numpy as np
+
+from tabular_io import DEFAULT_CHUNKSIZE, iter_chunks
+
+# ----------------------------
+# UNITS
+# ----------------------------
+# 1 unit = X of the dimension's base unit (meters, grams)
+LENGTH_UNITS = {
+    "Meters": 1.0,
+    "Kilometers": 1000.0,
+    "Centimeters": 0.01,
+    "Millimeters": 0.001,
+    "Miles": 1609.34,
+    "Yards": 0.9144,
+    "Feet": 0.3048,
+    "Inches": 0.0254,
+    "Nautical Miles": 1852.0,
+}
+
+WEIGHT_UNITS = {
+    "Grams": 1.0,
+    "Kilograms": 1000.0,
+    "Milligrams": 0.001,
+    "Pounds": 453.592,
+    "Ounces": 28.3495,
+    "Tons": 1000000.0,
+}
+
+TIME_UNITS = {
+    "Seconds": 1.0,
+    "Minutes": 60.0,
+    "Hours": 3600.0,
+    "Days": 86400.0,
+}
+
+# Temperatures are affine: kelvin = scale * value + offset
+TEMPERATURE_UNITS = {
+    "Celsius": (1.0, 273.15),
+    "Fahrenheit": (5 / 9, 273.15 - 32 * 5 / 9),
+    "Kelvin": (1.0, 0.0),
+}
+
+# Derived units are products of powers of the units above
+SPEED_UNITS = {
+    "Meters per second": {"Meters": 1, "Seconds": -1},
+    "Kilometers per hour": {"Kilometers": 1, "Hours": -1},
+    "Miles per hour": {"Miles": 1, "Hours": -1},
+    "Feet per second": {"Feet": 1, "Seconds": -1},
+    "Knots": {"Nautical Miles": 1, "Hours": -1},
+}
+
+# Mass per area; BMI is weight in kg over height in m squared
+AREA_DENSITY_UNITS = {
+    "Kilograms per square meter": {"Kilograms": 1, "Meters": -2},
+    "Pounds per square inch": {"Pounds": 1, "Inches": -2},
+    "Grams per square centimeter": {"Grams": 1, "Centimeters": -2},
+}
+
+# Converting unit i to unit j is `scale[i, j] * value + offset[i, j]`;
+# offset is all zeros except for temperature. `pairs` memoizes
+# (from unit, to unit) -> (scale, offset) as plain floats for single values
+Dimension = namedtuple("Dimension", ["name", "units", "index", "scale", "offset", "pairs"])
+
+
+# ----------------------------
+# HELPER FUNCTIONS
+# ----------------------------
+class UnitGraph:
+    """Units as nodes and affine conversions as edges.
+
+    Converting between two units follows the shortest chain of edges
+    between them. The chain is found once, collapsed into a single
+    (scale, offset) and memoized, so every later request for the same
+    pair is one dictionary lookup however many units are registered.
+    """
+
+    def __init__(self):
+        self.edges = {}
+        # dimension name -> units in registration order
+        self.dimensions = {}
+        self.unit_dimension = {}
+        # derived unit -> ({base dimension: exponent}, scale to those dimensions' first units)
+        self.derived = {}
+        self.transforms = {}
+
+    def _dimension_of(self, unit):
+        try:
+            return self.unit_dimension[unit]
+        except KeyError:
+            raise ValueError(f"Unknown unit: {unit}") from None
+
+    def add_unit(self, dimension, unit, to=None, scale=1.0, offset=0.0):
+        """Register `unit`, optionally with an edge where value in `to` = scale * value + offset."""
+        if unit in self.unit_dimension:
+            raise ValueError(f"{unit} is already registered")
+        self.unit_dimension[unit] = dimension
+        self.dimensions.setdefault(dimension, []).append(unit)
+        self.edges[unit] = {}
+        if to is not None:
+            self.add_conversion(unit, to, scale, offset)
+
+    def add_conversion(self, from_unit, to_unit, scale, offset=0.0):
+        """Add an edge both ways: value in `to_unit` = scale * value in `from_unit` + offset."""
+        if self._dimension_of(from_unit) != self._dimension_of(to_unit):
+            raise ValueError(f"Cannot convert {from_unit} to {to_unit}")
+        self.edges[from_unit][to_unit] = (scale, offset)
+        self.edges[to_unit][from_unit] = (1.0 / scale, -offset / scale)
+        # A new edge may open a shorter path for pairs already resolved
+        self.transforms.clear()
+
+    def add_derived(self, dimension, unit, factors):
+        """Register a product of powers of linear units, e.g. {"Kilometers": 1, "Hours": -1}.
+
+        The first unit of `dimension` fixes which powers it is made of;
+        later ones must match and get one edge to it.
+        """
+        powers, scale = {}, 1.0
+        for base, exponent in factors.items():
+            base_dimension = self._dimension_of(base)
+            first = self.dimensions[base_dimension][0]
+            if any(self.transform(other, first)[1] for other in self.dimensions[base_dimension]):
+                raise ValueError(f"{base} has an offset and cannot be part of a derived unit")
+            base_scale, _ = self.transform(base, first)
+            powers[base_dimension] = powers.get(base_dimension, 0) + exponent
+            scale *= base_scale ** exponent
+        powers = {name: exponent for name, exponent in powers.items() if exponent}
+        if dimension in self.dimensions:
+            first = self.dimensions[dimension][0]
+            first_powers, first_scale = self.derived[first]
+            if powers != first_powers:
+                raise ValueError(f"{unit} is not a {dimension.lower()} unit")
+            self.add_unit(dimension, unit, first, scale / first_scale)
+        else:
+            self.add_unit(dimension, unit)
+        self.derived[unit] = (powers, scale)
+
+    def transform(self, from_unit, to_unit):
+        """Return (scale, offset) converting `from_unit` to `to_unit`, memoized per pair.
+
+        A breadth-first search outwards from `to_unit` finds the fewest-edge
+        path from every unit, composing the edges as it goes. All of them
+        are memoized, so any later lookup towards `to_unit` is a hit.
+        """
+        key = (from_unit, to_unit)
+        if key in self.transforms:
+            return self.transforms[key]
+        if self._dimension_of(from_unit) != self._dimension_of(to_unit):
+            raise ValueError(f"Cannot convert {from_unit} to {to_unit}")
+        self.transforms[(to_unit, to_unit)] = (1.0, 0.0)
+        seen = {to_unit}
+        queue = deque([to_unit])
+        while queue:
+            unit = queue.popleft()
+            scale, offset = self.transforms[(unit, to_unit)]
+            for neighbour in self.edges[unit]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    # neighbour -> unit, then unit -> to_unit: s * (es * x + eo) + o
+                    edge_scale, edge_offset = self.edges[neighbour][unit]
+                    self.transforms[(neighbour, to_unit)] = (scale * edge_scale, scale * edge_offset + offset)
+                    queue.append(neighbour)
+        if key not in self.transforms:
+            raise ValueError(f"No conversion from {from_unit} to {to_unit}")
+        return self.transforms[key]
+
+    def convert(self, value, from_unit, to_unit):
+        scale, offset = self.transform(from_unit, to_unit)
+        return value * scale + offset
+
+    def dimension(self, name):
+        """Dense Dimension tables for every unit of `name`, for vectorised conversion."""
+        units = self.dimensions[name]
+        return make_dimension(name, {unit: self.transform(unit, units[0]) for unit in units})
+
+
+def register_units(graph, dimension, units, base):
+    """Add a table of sizes (or (scale, offset) pairs) in the `base` unit to `graph`."""
+    for unit in units:
+        graph.add_unit(dimension, unit)
+    for unit, size in units.items():
+        if unit != base:
+            graph.add_conversion(unit, base, *(size if isinstance(size, tuple) else (size,)))
+
+
+def make_dimension(name, units):
+    """Precompute the N x N conversion tables for one dimension.
+
+    `units` maps each unit to its size in the base unit, or to a
+    (scale, offset) pair for affine units such as temperatures.
+    """
+    pairs = [u if isinstance(u, tuple) else (u, 0.0) for u in units.values()]
+    s, o = np.array(pairs, dtype=float).T
+    # value_j = (s_i * value_i + o_i - o_j) / s_j
+    scale = s[:, None] / s[None, :]
+    offset = (o[:, None] - o[None, :]) / s[None, :]
+    return Dimension(name, list(units), {unit: i for i, unit in enumerate(units)}, scale, offset, {})
+
+
+def currency_dimension(rates):
+    """Dimension for a {currency: rate} snapshot quoted as 1 base = rate."""
+    return make_dimension("Currency", {code: 1.0 / rate for code, rate in rates.items()})
+
+
+def unit_codes(dimension, units):
+    """Row/column index of one unit name or of an array of unit names."""
+    if isinstance(units, str):
+        try:
+            return dimension.index[units]
+        except KeyError:
+            raise ValueError(f"Unknown {dimension.name.lower()} unit: {units}") from None
+    import pandas as pd
+
+    # Hash the names once each instead of looking up every row
+    codes, uniques = pd.factorize(np.asarray(units, dtype=object))
+    return np.array([unit_codes(dimension, u) for u in uniques], dtype=np.intp)[codes]
+
+
+def factor(dimension, from_unit, to_unit):
+    """Return (scale, offset) converting `from_unit` to `to_unit`.
+
+    For a single pair of unit names this is one dictionary lookup once the
+    pair has been seen; arrays of names index the dense tables.
+    """
+    if isinstance(from_unit, str) and isinstance(to_unit, str):
+        try:
+            return dimension.pairs[from_unit, to_unit]
+        except KeyError:
+            i, j = unit_codes(dimension, from_unit), unit_codes(dimension, to_unit)
+            pair = dimension.pairs[from_unit, to_unit] = (dimension.scale.item(i, j), dimension.offset.item(i, j))
+            return pair
+    i, j = unit_codes(dimension, from_unit), unit_codes(dimension, to_unit)
+    return dimension.scale[i, j], dimension.offset[i, j]
+
+
+def convert_units(dimension, values, from_unit, to_unit):
+    """Convert a value or a whole array of values with one table lookup.
+
+    `from_unit` and `to_unit` may also be arrays of unit names, one per
+    value, in which case every row gets its own factor in the same pass.
+    """
+    if isinstance(values, (int, float)):
+        # Plain float maths on the memoized pair is much cheaper than NumPy
+        # for one value; arrays of unit names are not hashable and miss
+        try:
+            scale, offset = dimension.pairs[from_unit, to_unit]
+        except (KeyError, TypeError):
+            scale, offset = factor(dimension, from_unit, to_unit)
+        return values * scale + offset
+    scale, offset = factor(dimension, from_unit, to_unit)
+    return np.asarray(values, dtype=float) * scale + offset
+
+
+def convert_columns(frame, conversions):
+    """Return `frame` with a converted copy of each mapped column appended.
+
+    `conversions` maps a column name to (dimension name, from unit, to unit).
+    Each column is converted in one NumPy pass; cells that are not numbers
+    become NaN.
+    """
+    import pandas as pd
+
+    converted = {}
+    for column, (dimension, from_unit, to_unit) in conversions.items():
+        values = pd.to_numeric(frame[column], errors="coerce").to_numpy(dtype=float)
+        converted[f"{column} ({to_unit})"] = convert_units(DIMENSIONS[dimension], values, from_unit, to_unit)
+    return frame.assign(**converted)
+
+
+def convert_file(source, conversions, fmt=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield converted chunks of a CSV/Parquet file; see convert_columns.
+
+    Only one chunk is in memory at a time, so files of any length can be
+    streamed straight into tabular_io.spool_export.
+    """
+    for chunk in iter_chunks(source, fmt, chunksize):
+        missing = set(conversions) - set(chunk.columns)
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(sorted(map(str, missing)))}")
+        yield convert_columns(chunk, conversions)
+
+
+# Adding a unit is one entry in a table above (or one add_unit call)
+UNIT_GRAPH = UnitGraph()
+register_units(UNIT_GRAPH, "Temperature", TEMPERATURE_UNITS, "Kelvin")
+register_units(UNIT_GRAPH, "Length", LENGTH_UNITS, "Meters")
+register_units(UNIT_GRAPH, "Weight", WEIGHT_UNITS, "Grams")
+register_units(UNIT_GRAPH, "Time", TIME_UNITS, "Seconds")
+for dimension, units in (("Speed", SPEED_UNITS), ("Area Density", AREA_DENSITY_UNITS)):
+    for unit, factors in units.items():
+        UNIT_GRAPH.add_derived(dimension, unit, factors)
+
+DIMENSIONS = {name: UNIT_GRAPH.dimension(name) for name in UNIT_GRAPH.dimensions}